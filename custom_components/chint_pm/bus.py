@@ -0,0 +1,548 @@
+"""Shared modbus buses of the Chint pm meters."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+import logging
+import time
+from typing import Any, TypeVar
+
+from pymodbus import FramerType
+from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    BUS_UTILISATION_WINDOW,
+    DATA_ARBITRATOR,
+    FRAMER_RTU_OVER_TCP,
+    FRAMER_TCP,
+    METER_RESPONSE_TIME,
+    NETWORK_TIMEOUT,
+    PRIORITY_POLL,
+    READ_LIMIT_RETRY_INTERVAL,
+    READ_LOSS_LIMIT,
+    SERIAL_BAUDRATE,
+    SERIAL_TIMEOUT,
+    TCP_READ_COST,
+)
+from .registers import MAX_READ_COUNT
+from .sniffer import BusSniffer
+from .stats import LinkStats, ReadCostModel
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ModbusBus:
+    """One physical bus (serial line or TCP gateway) and its modbus client.
+
+    All transactions on the bus run one after another from a single worker,
+    with the inter-frame gap of the line in between. Every coordinator using
+    the bus has its own queue and the worker serves the queues round robin,
+    so a meter with many pending reads cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        key: tuple,
+        client,
+        frame_gap: float,
+        framer: str | None = None,
+        learn: bool = True,
+    ) -> None:
+        """Initialize the bus."""
+        self._hass = hass
+        self.key = key
+        self.client = client
+        self._frame_gap = frame_gap
+        # framing of a network transport, None for serial lines
+        self.framer = framer
+        # read costs and sizes are learned on real transports only, not on
+        # prebuilt clients such as a replay
+        self.learn = learn
+        # one round robin of owner queues per priority class
+        self._queues: tuple[OrderedDict[object, deque], ...] = tuple(
+            OrderedDict() for _ in range(PRIORITY_POLL + 1)
+        )
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self.users = 0
+        self._connected_before = False
+        # statistics, exported by the metrics view
+        self.transaction_count = 0
+        self.stats = LinkStats()
+        self.cost = ReadCostModel(*_read_cost_prior(framer))
+        # registers per read the gateway answers, learned from lost reads
+        # below the configured limit
+        self.max_count = MAX_READ_COUNT
+        self.read_count_limit = MAX_READ_COUNT
+        self.largest_read = 0
+        # cycles with lost reads per read size, the learned limit while the
+        # configured one is tried again, and when the limit last changed
+        self._losses: Counter[int] = Counter()
+        self._trial_from: int | None = None
+        self._limit_changed = time.monotonic()
+        self._busy = 0.0
+        self._window_start = time.monotonic()
+        self._utilisation: float | None = None
+
+    @property
+    def name(self) -> str:
+        """Return a readable name of the bus."""
+        host, port = self.key
+        return port if host is None else f"{host}:{port}"
+
+    @property
+    def max_gap(self) -> int:
+        """Return the registers worth reading over to save a request."""
+        return self.cost.max_gap(self._frame_gap)
+
+    @property
+    def learned_count(self) -> int:
+        """Return the registers per read learned, without a running trial."""
+        return self.max_count if self._trial_from is None else self._trial_from
+
+    def limit_read_count(self, count: int) -> None:
+        """Lower the configured registers per read."""
+        self.read_count_limit = max(1, min(self.read_count_limit, count))
+        self.max_count = min(self.max_count, self.read_count_limit)
+
+    def restore_read_count(self, learned: int, largest_read: int) -> None:
+        """Take the read size learned before a restart."""
+        self.max_count = max(1, min(self.max_count, learned))
+        self.largest_read = max(self.largest_read, min(largest_read, self.max_count))
+
+    def read_answered(self, count: int) -> None:
+        """Take a read of count registers that was answered."""
+        self.largest_read = max(self.largest_read, count)
+        if self._trial_from is not None and count > self._trial_from:
+            self._trial_from = None
+            _LOGGER.info(
+                "%s: reads of %s registers are answered again, reading at most %s",
+                self.name,
+                count,
+                self.max_count,
+            )
+        if self._losses:
+            for size in [size for size in self._losses if size <= count]:
+                del self._losses[size]
+
+    def read_lost(self, count: int) -> None:
+        """Take a cycle in which reads of count registers went unanswered.
+
+        Some gateways drop reads too large for their buffers instead of
+        answering with an exception, which looks like a timeout. Only cycles
+        in which smaller reads of the slave were answered are taken. Once
+        READ_LOSS_LIMIT of them lost reads of this size or smaller ones, and
+        no read this large was answered before, the limit is halved towards
+        the largest read answered. A limit raised for a trial goes back with
+        the first loss above the learned one.
+        """
+        if not self.largest_read < count <= self.max_count:
+            return
+        if self._trial_from is not None and count > self._trial_from:
+            self.max_count = self._trial_from
+        else:
+            self._losses[count] += 1
+            if (
+                sum(losses for size, losses in self._losses.items() if size <= count)
+                < READ_LOSS_LIMIT
+            ):
+                return
+            self.max_count = (self.largest_read + count) // 2
+        self._trial_from = None
+        self._losses.clear()
+        self._limit_changed = time.monotonic()
+        _LOGGER.warning(
+            "%s: reads of %s registers go unanswered, reading at most %s",
+            self.name,
+            count,
+            self.max_count,
+        )
+
+    def retry_read_limit(self) -> None:
+        """Try the configured read size again a while after it was lowered.
+
+        A gateway may have dropped reads for another reason than their size,
+        so a learned limit would otherwise never recover.
+        """
+        if (
+            self.learn
+            and self._trial_from is None
+            and self.max_count < self.read_count_limit
+            and time.monotonic() - self._limit_changed >= READ_LIMIT_RETRY_INTERVAL
+        ):
+            self._trial_from = self.max_count
+            self.max_count = self.read_count_limit
+            self._limit_changed = time.monotonic()
+            _LOGGER.info(
+                "%s: trying reads of up to %s registers again",
+                self.name,
+                self.max_count,
+            )
+
+    @property
+    def utilisation(self) -> float:
+        """Return the busy share of the last complete window (0..1)."""
+        self._roll_window(time.monotonic())
+        if self._utilisation is None:
+            elapsed = time.monotonic() - self._window_start
+            return self._busy / elapsed if elapsed > 0 else 0.0
+        return self._utilisation
+
+    def _roll_window(self, now: float) -> None:
+        if now - self._window_start >= BUS_UTILISATION_WINDOW:
+            self._utilisation = min(1.0, self._busy / (now - self._window_start))
+            self._busy = 0.0
+            self._window_start = now
+
+    async def execute(
+        self,
+        owner,
+        transaction: Callable[[Any], Awaitable[T]],
+        priority: int = PRIORITY_POLL,
+    ) -> T:
+        """Queue a transaction for owner and wait for its result.
+
+        Queued transactions of a higher priority class (lower number) always
+        run before background polling; a transaction already on the wire is
+        never interrupted.
+        """
+        future = self._hass.loop.create_future()
+        self._queues[priority].setdefault(owner, deque()).append((transaction, future))
+        self._wakeup.set()
+        if self._worker is None:
+            self._worker = self._hass.async_create_background_task(
+                self._run(), f"chint_pm bus {self.name}"
+            )
+        return await future
+
+    async def async_connect(self, stats: LinkStats | None = None) -> bool:
+        """Connect the client if needed, counting reconnects."""
+        if not self.client.connected:
+            if self._connected_before:
+                self.stats.reconnects += 1
+                if stats is not None:
+                    stats.reconnects += 1
+            await self.client.connect()
+            self._connected_before = self._connected_before or self.client.connected
+        return self.client.connected
+
+    def _next(self):
+        for queues in self._queues:
+            for owner, queue in list(queues.items()):
+                while queue:
+                    transaction, future = queue.popleft()
+                    if not future.done():
+                        queues.move_to_end(owner)
+                        return transaction, future
+                # drop owners that are gone (e.g. finished config flow probes)
+                del queues[owner]
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            if (item := self._next()) is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            transaction, future = item
+            start = time.monotonic()
+            try:
+                result = await transaction(self.client)
+            except ModbusIOException as err:
+                # a slave that does not answer says nothing about the
+                # transport shared with the others, anything else forces a
+                # reconnect with the next transaction
+                if not is_unanswered(err):
+                    self.client.close()
+                if not future.done():
+                    future.set_exception(err)
+            except Exception as err:  # pylint: disable=broad-except
+                if not future.done():
+                    future.set_exception(err)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            end = time.monotonic()
+            self._busy += end - start
+            self.transaction_count += 1
+            self._roll_window(end)
+            if self._frame_gap:
+                await asyncio.sleep(self._frame_gap)
+
+    async def async_close(self) -> None:
+        """Stop the worker, fail pending transactions and close the client."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+        for queues in self._queues:
+            for queue in queues.values():
+                for _transaction, future in queue:
+                    if not future.done():
+                        future.set_exception(ConnectionException("bus closed"))
+            queues.clear()
+        self.client.close()
+
+
+class BusClient:
+    """Client facade routing the transactions of one coordinator via its bus.
+
+    It offers the subset of the pymodbus client interface used by
+    ChintDxsuDevice.
+    """
+
+    def __init__(
+        self,
+        bus: ModbusBus,
+        owner,
+        priority: int = PRIORITY_POLL,
+        stats: LinkStats | None = None,
+    ) -> None:
+        """Initialize the facade."""
+        self._bus = bus
+        self._owner = owner
+        self._priority = priority
+        # counters of the slave, the bus keeps its own
+        self._stats = stats
+        # seconds the transactions of this client spent on the wire
+        self._wire_time = 0.0
+        self.DATATYPE = bus.client.DATATYPE
+        self.convert_from_registers = bus.client.convert_from_registers
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the bus client is connected."""
+        return self._bus.client.connected
+
+    def wire_time(self) -> float:
+        """Return the seconds the transactions of this client took on the bus.
+
+        Unlike the time since queueing, this does not grow while other
+        owners of the bus are served.
+        """
+        return self._wire_time
+
+    async def connect(self) -> bool:
+        """Connect the bus client."""
+        return await self._bus.execute(
+            self._owner,
+            lambda client: self._bus.async_connect(self._stats),
+            self._priority,
+        )
+
+    async def read_holding_registers(self, address, *, count=1, device_id=1):
+        """Read holding registers through the bus."""
+        return await self._execute(
+            lambda client: client.read_holding_registers(
+                address=address, count=count, device_id=device_id
+            ),
+            count,
+        )
+
+    async def write_registers(self, address, values, *, device_id=1):
+        """Write holding registers through the bus."""
+        return await self._execute(
+            lambda client: client.write_registers(
+                address=address, values=values, device_id=device_id
+            )
+        )
+
+    async def _execute(self, request, count: int | None = None):
+        """Run a request on the bus and record it in the link counters."""
+        stats = (
+            (self._bus.stats,)
+            if self._stats is None
+            else (self._bus.stats, self._stats)
+        )
+
+        async def transaction(client):
+            # timed on the wire, without the wait in the bus queue
+            start = time.monotonic()
+            try:
+                response = await request(client)
+            except Exception as err:
+                self._wire_time += time.monotonic() - start
+                for link_stats in stats:
+                    link_stats.record_error(err)
+                raise
+            rtt = time.monotonic() - start
+            self._wire_time += rtt
+            for link_stats in stats:
+                link_stats.record_response(response, rtt, count)
+            if (
+                count is not None
+                and self._bus.learn
+                and not response.isError()
+                and len(response.registers) == count
+            ):
+                self._bus.cost.add(count, rtt)
+                self._bus.read_answered(count)
+            return response
+
+        return await self._bus.execute(self._owner, transaction, self._priority)
+
+    def read_lost(self, count: int) -> None:
+        """Tell the bus that reads of count registers went unanswered."""
+        if self._bus.learn:
+            self._bus.read_lost(count)
+
+
+class BusArbitrator:
+    """Owns one ModbusBus per physical transport, shared by all entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the arbitrator."""
+        self._hass = hass
+        self.buses: dict[tuple, ModbusBus] = {}
+        self.sniffers: dict[tuple, BusSniffer] = {}
+
+    async def async_acquire(
+        self, host, port, client=None, framer: str = FRAMER_TCP
+    ) -> ModbusBus:
+        """Return the bus of a transport, creating its client if needed.
+
+        A transparent serial server passes RTU frames on to its line, so an
+        RTU over TCP bus keeps the inter-frame gap of a serial line. A bus of
+        a prebuilt client does not learn read costs and sizes, and it is
+        never shared: neither can a prebuilt client take over the bus of a
+        transport in use, nor can a meter of that transport join it.
+        """
+        key = (host, str(port))
+        if host is None:
+            framer = None
+        if key in self.sniffers:
+            raise ConnectionException(f"{port} is in listen-only use")
+        if (bus := self.buses.get(key)) is None:
+            learn = client is None
+            if client is None:
+                client = _create_client(host, port, framer)
+            frame_gap = 0.0 if framer == FRAMER_TCP else _rtu_frame_gap(SERIAL_BAUDRATE)
+            bus = self.buses[key] = ModbusBus(
+                self._hass, key, client, frame_gap, framer, learn
+            )
+        elif client is not None or not bus.learn:
+            # a prebuilt client (e.g. a replay) never shares a transport
+            raise ConnectionException(f"{bus.name} is already in use")
+        elif bus.framer != framer:
+            raise ConnectionException(
+                f"{host}:{port} is already used with {bus.framer} framing"
+            )
+        bus.users += 1
+        return bus
+
+    async def async_release(self, bus: ModbusBus) -> None:
+        """Release a bus, closing it when it has no users left."""
+        bus.users -= 1
+        if bus.users <= 0 and self.buses.get(bus.key) is bus:
+            del self.buses[bus.key]
+            await bus.async_close()
+
+    async def async_acquire_sniffer(self, port) -> BusSniffer:
+        """Return the listen-only sniffer of a serial port, opening it if needed.
+
+        A port is either polled or listened to, never both.
+        """
+        key = (None, str(port))
+        if key in self.buses:
+            raise ConnectionException(f"{port} is polled, it cannot be listened to")
+        if (sniffer := self.sniffers.get(key)) is None:
+            sniffer = self.sniffers[key] = BusSniffer(
+                self._hass, key, str(port), SERIAL_BAUDRATE
+            )
+            sniffer.async_start()
+        sniffer.users += 1
+        return sniffer
+
+    async def async_release_sniffer(self, sniffer: BusSniffer) -> None:
+        """Release a sniffer, closing its port when it has no users left."""
+        sniffer.users -= 1
+        if sniffer.users <= 0 and self.sniffers.get(sniffer.key) is sniffer:
+            del self.sniffers[sniffer.key]
+            await sniffer.async_close()
+
+    async def async_shutdown(self, *_) -> None:
+        """Close all buses and sniffers."""
+        for bus in list(self.buses.values()):
+            await bus.async_close()
+        self.buses.clear()
+        for sniffer in list(self.sniffers.values()):
+            await sniffer.async_close()
+        self.sniffers.clear()
+
+
+@callback
+def async_get_arbitrator(hass: HomeAssistant) -> BusArbitrator:
+    """Return the bus arbitrator, creating it on first use.
+
+    The config flow may run before the integration is set up, so this must
+    not depend on async_setup.
+    """
+    if (arbitrator := hass.data.get(DATA_ARBITRATOR)) is None:
+        arbitrator = hass.data[DATA_ARBITRATOR] = BusArbitrator(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, arbitrator.async_shutdown)
+    return arbitrator
+
+
+def _create_client(host, port, framer: str | None = None):
+    # retried per block by ChintDxsuDevice, a retry within pymodbus would
+    # hold the shared line for another timeout
+    if host is None:
+        return AsyncModbusSerialClient(
+            port=port,
+            baudrate=SERIAL_BAUDRATE,
+            bytesize=8,
+            stopbits=1,
+            parity="N",
+            timeout=SERIAL_TIMEOUT,
+            retries=0,
+        )
+    if framer == FRAMER_RTU_OVER_TCP:
+        return AsyncModbusTcpClient(
+            host=host,
+            port=port,
+            framer=FramerType.RTU,
+            timeout=NETWORK_TIMEOUT,
+            retries=0,
+        )
+    return AsyncModbusTcpClient(
+        host=host, port=port, timeout=NETWORK_TIMEOUT, retries=0
+    )
+
+
+def is_unanswered(err: Exception) -> bool:
+    """Return True if a request failed because no response arrived."""
+    return isinstance(err, TimeoutError) or (
+        isinstance(err, ModbusIOException) and "No response" in str(err)
+    )
+
+
+def _read_cost_prior(framer: str | None) -> tuple[float, float]:
+    """Return the fixed cost of a read and its cost per register (s).
+
+    On an RTU line every register is two characters and a read costs the 8
+    characters of the request, the 5 of the response and the response time
+    of the meter; a TCP gateway is all fixed cost until measured.
+    """
+    if framer == FRAMER_TCP:
+        return TCP_READ_COST
+    character = 10 / SERIAL_BAUDRATE
+    return 13 * character + METER_RESPONSE_TIME, 2 * character
+
+
+def _rtu_frame_gap(baudrate: int) -> float:
+    """Return the 3.5 character silent interval of a 8N1 RTU line."""
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * 10 / baudrate
@@ -0,0 +1,167 @@
+"""Raw register capture log for the Chint pm integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import mmap
+import os
+import struct
+import threading
+
+CAPTURE_MAGIC = b"CHPMCAP1"
+
+# marker, timestamp, unit id, start address, word count
+_RECORD_HEADER = struct.Struct("<HdBHH")
+_RECORD_MARKER = 0xC0DE
+
+
+@dataclass(frozen=True)
+class CaptureRecord:
+    """One raw read_holding_registers response."""
+
+    timestamp: float
+    unit_id: int
+    address: int
+    registers: tuple[int, ...]
+
+
+class RegisterCaptureLog:
+    """Append-only, memory-mapped log of raw register responses.
+
+    The file is preallocated to ``max_bytes`` and mapped once, so appending a
+    record is a plain memory copy. When a record does not fit anymore
+    ``append`` returns False and the caller has to ``rotate`` (file I/O, run it
+    in the executor) before retrying. Only one caller is told so; records
+    appended while the rotation is due or running, or after ``close``, are
+    dropped. A rotation after ``close`` does not reopen the file.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int = 2) -> None:
+        """Initialize the capture log."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = None
+        self._mmap: mmap.mmap | None = None
+        self._offset = 0
+        self._rotate_due = False
+        # held by rotate and close, which run in the executor
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """Open (or create) the log file and map it into memory."""
+        with self._lock:
+            self._open()
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as file:
+                file.write(CAPTURE_MAGIC)
+                file.truncate(self.max_bytes)
+
+        self._file = open(self.path, "r+b")  # noqa: SIM115
+        if os.fstat(self._file.fileno()).st_size < self.max_bytes:
+            self._file.truncate(self.max_bytes)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        if self._mmap[: len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            self._unmap()
+            raise ValueError(f"{self.path} is not a register capture file")
+
+        # continue after the last complete record
+        self._offset = len(CAPTURE_MAGIC)
+        for _record, end in _iter_records(self._mmap):
+            self._offset = end
+
+    def append(
+        self, timestamp: float, unit_id: int, address: int, registers: list[int]
+    ) -> bool:
+        """Append one record, return False when the caller has to rotate."""
+        if not self._lock.acquire(blocking=False):
+            # rotating or closing in the executor
+            return True
+        try:
+            if self._mmap is None or self._rotate_due:
+                return True
+            count = len(registers)
+            end = self._offset + _RECORD_HEADER.size + 2 * count
+            if end > len(self._mmap):
+                self._rotate_due = True
+                return False
+
+            _RECORD_HEADER.pack_into(
+                self._mmap,
+                self._offset,
+                _RECORD_MARKER,
+                timestamp,
+                unit_id,
+                address,
+                count,
+            )
+            struct.pack_into(
+                f"<{count}H", self._mmap, self._offset + _RECORD_HEADER.size, *registers
+            )
+            self._offset = end
+            return True
+        finally:
+            self._lock.release()
+
+    def rotate(self) -> None:
+        """Move the current file to a numbered backup and start a new one."""
+        with self._lock:
+            self._rotate_due = False
+            if self._mmap is None:
+                # closed meanwhile, e.g. the entry was unloaded
+                return
+            self._unmap()
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            if self.backup_count > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+            self._open()
+
+    def close(self) -> None:
+        """Flush and unmap the log file."""
+        with self._lock:
+            self._unmap()
+
+    def _unmap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_capture_file(path: str) -> Iterator[CaptureRecord]:
+    """Yield all records stored in a capture file."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[: len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+        raise ValueError(f"{path} is not a register capture file")
+    for record, _end in _iter_records(data):
+        yield record
+
+
+def _iter_records(buffer) -> Iterator[tuple[CaptureRecord, int]]:
+    offset = len(CAPTURE_MAGIC)
+    size = len(buffer)
+    while offset + _RECORD_HEADER.size <= size:
+        marker, timestamp, unit_id, address, count = _RECORD_HEADER.unpack_from(
+            buffer, offset
+        )
+        end = offset + _RECORD_HEADER.size + 2 * count
+        if marker != _RECORD_MARKER or end > size:
+            return
+        registers = struct.unpack_from(
+            f"<{count}H", buffer, offset + _RECORD_HEADER.size
+        )
+        yield CaptureRecord(timestamp, unit_id, address, registers), end
+        offset = end
@@ -2,15 +2,13 @@
 
 from __future__ import annotations
 
+import ipaddress
 import logging
 from typing import Any
 
-from pymodbus.client import ModbusSerialClient, ModbusTcpClient
-import serial.tools.list_ports
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.components import usb
 from homeassistant.const import (
     CONF_HOST,
     CONF_PASSWORD,
@@ -18,22 +16,38 @@ from homeassistant.const import (
     CONF_TYPE,
     CONF_USERNAME,
 )
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
+    CONF_CAPTURE_MAX_SIZE,
+    CONF_CAPTURE_RAW,
+    CONF_FRAMER,
+    CONF_MAX_READ_COUNT,
     CONF_METER_TYPE,
+    CONF_PASSIVE,
     CONF_PHASE_MODE,
+    CONF_PROXY_HOST,
+    CONF_PROXY_MAX_AGE,
+    CONF_PROXY_PORT,
     CONF_SLAVE_IDS,
+    DEFAULT_CAPTURE_MAX_SIZE,
     DEFAULT_PORT,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_PROXY_MAX_AGE,
     DEFAULT_SERIAL_SLAVE_ID,
     DEFAULT_SLAVE_ID,
     DEFAULT_USERNAME,
     DOMAIN,
+    FRAMER_RTU_OVER_TCP,
+    FRAMER_TCP,
     PHMODE_3P3W,
     PHMODE_3P4W,
-    MeterTypes,
+    PRIORITY_INTERACTIVE,
 )
+from .profiles import PROFILES, get_profile
+from .registers import MAX_READ_COUNT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,6 +56,12 @@ STEP_SETUP_NETWORK_DATA_SCHEMA = vol.Schema(
         vol.Required(CONF_HOST): str,
         vol.Required(CONF_PORT, default=DEFAULT_PORT): cv.port,
         vol.Required(CONF_SLAVE_IDS, default=str(DEFAULT_SLAVE_ID)): str,
+        vol.Required(CONF_FRAMER, default=FRAMER_TCP): vol.In(
+            {
+                FRAMER_TCP: "Modbus TCP",
+                FRAMER_RTU_OVER_TCP: "RTU over TCP (transparent serial server)",
+            }
+        ),
     }
 )
 
@@ -59,10 +79,7 @@ STEP_PM_CONFIG_DATA_SCHEMA = vol.Schema(
 STEP_METER_TYPE_CONFIG_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_METER_TYPE): vol.In(
-            {
-                MeterTypes.METER_TYPE_H_3P: "DTSU666-H (Huawei)",
-                MeterTypes.METER_TYPE_CT_3P: "DTSU666 (Normal)",
-            }
+            {meter_type: profile.name for meter_type, profile in PROFILES.items()}
         )
     }
 )
@@ -70,6 +87,14 @@ STEP_METER_TYPE_CONFIG_DATA_SCHEMA = vol.Schema(
 CONF_MANUAL_PATH = "Enter Manually"
 
 
+def _listen_address(value: Any) -> str:
+    """Validate the address the proxy listens on, 0.0.0.0 or :: for all."""
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError as err:
+        raise vol.Invalid(f"{value} is not an IP address") from err
+
+
 def _resolve_ph_mode(net: int) -> str:
     if net == 0:
         return PHMODE_3P4W
@@ -77,74 +102,103 @@ def _resolve_ph_mode(net: int) -> str:
         return PHMODE_3P3W
 
 
-async def validate_serial_setup(data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the serial device that was passed by the user."""
+def _list_serial_ports() -> dict[str, str]:
+    """Return the serial ports by device path with a readable name.
 
-    client = None
-    try:
-        client = ModbusSerialClient(
-            port=data[CONF_PORT], baudrate=9600, bytesize=8, stopbits=1, parity="N"
+    The usb component and pyserial are imported on first use (blocking), so
+    the flow only loads them when a serial meter is set up.
+    """
+    # pylint: disable=import-outside-toplevel
+    import serial.tools.list_ports
+
+    from homeassistant.components import usb
+
+    return {
+        port.device: usb.human_readable_device_name(
+            port.device,
+            port.serial_number,
+            port.manufacturer,
+            port.description,
+            port.vid,
+            port.pid,
         )
-        client.connect()
+        for port in serial.tools.list_ports.comports()
+    }
 
-        rr = client.read_holding_registers(
-            address=0x0, count=4, device_id=data[CONF_SLAVE_IDS][0]
-        )
-        decoder = client.convert_from_registers(
-            rr.registers, data_type=client.DATATYPE.UINT16
-        )
-        rev = decoder[0]
-        ucode = decoder[1]
-        clre = decoder[2]
-        net = decoder[3]
 
-        rr = client.read_holding_registers(
-            address=0xB, count=1, device_id=data[CONF_SLAVE_IDS][0]
-        )
-        decoder = client.convert_from_registers(
-            rr.registers, data_type=client.DATATYPE.UINT16
-        )
-        # device_type = decoder[0]
+def _serial_by_id(device_path: str) -> str:
+    """Return the stable by-id link of a serial port (blocking)."""
+    from homeassistant.components import usb  # pylint: disable=import-outside-toplevel
 
-        _LOGGER.info(
-            "Successfully connected to pm phase mode %s",
-            net,
-        )
+    return usb.get_serial_by_id(device_path)
 
-        match data[CONF_METER_TYPE]:
-            case MeterTypes.METER_TYPE_CT_3P:
-                meter_type_name = "DTSU-666"
-            case _:
-                meter_type_name = "DTSU-666-H"
 
-        result = {
-            "model_name": f"{meter_type_name} ({data[CONF_PORT]}@{data[CONF_SLAVE_IDS][0]})",
-            "rev": rev,
-            CONF_PHASE_MODE: _resolve_ph_mode(net),
-        }
+async def validate_serial_setup(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> dict[str, Any]:
+    """Validate the serial device that was passed by the user.
 
-        # Return info that you want to store in the config entry.
-        return result
-
-    finally:
-        if client is not None:
-            # Cleanup this inverter object explicitly to prevent it from trying to maintain a modbus connection
-            client.close()
+    A listen-only meter is not probed, that would send a request; its phase
+    mode is asked in the next step anyway.
+    """
+    if data.get(CONF_PASSIVE):
+        profile = PROFILES[data[CONF_METER_TYPE]]
+        return {
+            "model_name": f"{profile.model} ({data[CONF_PORT]}@{data[CONF_SLAVE_IDS][0]})"
+        }
+    return await _async_validate_setup(
+        hass, None, data[CONF_PORT], data, f"{data[CONF_PORT]}"
+    )
 
 
-async def validate_network_setup(data: dict[str, Any]) -> dict[str, Any]:
+async def validate_network_setup(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> dict[str, Any]:
     """Validate the user input allows us to connect.
     Data has the keys from STEP_SETUP_NETWORK_DATA_SCHEMA with values provided by the user.
     """
-
-    client = None
+    return await _async_validate_setup(
+        hass,
+        data[CONF_HOST],
+        data[CONF_PORT],
+        data,
+        f"{data[CONF_HOST]}:{data[CONF_PORT]}",
+        data.get(CONF_FRAMER, FRAMER_TCP),
+    )
+
+
+async def _async_validate_setup(
+    hass: HomeAssistant,
+    host,
+    port,
+    data: dict[str, Any],
+    location: str,
+    framer: str = FRAMER_TCP,
+) -> dict[str, Any]:
+    """Probe the meter through the shared bus of its transport.
+
+    If a running entry already polls this port or gateway, its connection is
+    reused and the probe is queued ahead of the background polling; otherwise
+    the bus is opened for the probe and closed again afterwards.
+    """
+    # the bus module is imported when a meter is probed
+    from .bus import (  # pylint: disable=import-outside-toplevel
+        BusClient,
+        async_get_arbitrator,
+    )
+
+    arbitrator = async_get_arbitrator(hass)
+    bus = await arbitrator.async_acquire(host, port, framer=framer)
     try:
-        client = ModbusTcpClient(host=data[CONF_HOST], port=data[CONF_PORT], timeout=5)
-        client.connect()
+        client = BusClient(bus, object(), PRIORITY_INTERACTIVE)
+        if not client.connected:
+            await client.connect()
 
-        rr = client.read_holding_registers(
+        rr = await client.read_holding_registers(
             address=0x0, count=4, device_id=data[CONF_SLAVE_IDS][0]
         )
+        if rr.isError():
+            raise SlaveException(f"Slave {data[CONF_SLAVE_IDS][0]} returned {rr}")
         decoder = client.convert_from_registers(
             rr.registers, data_type=client.DATATYPE.UINT16
         )
@@ -153,38 +207,24 @@ async def validate_network_setup(data: dict[str, Any]) -> dict[str, Any]:
         clre = decoder[2]
         net = decoder[3]
 
-        rr = client.read_holding_registers(
-            address=0xB, count=1, device_id=data[CONF_SLAVE_IDS][0]
-        )
-        decoder = client.convert_from_registers(
-            rr.registers, data_type=client.DATATYPE.UINT16
-        )
-        # device_type = decoder[0]
-
         _LOGGER.info(
             "Successfully connected to pm phase mode %s",
             net,
         )
 
-        match data[CONF_METER_TYPE]:
-            case MeterTypes.METER_TYPE_CT_3P:
-                meter_type_name = "DTSU-666"
-            case _:
-                meter_type_name = "DTSU-666-H"
-
+        profile = get_profile(data[CONF_METER_TYPE], _resolve_ph_mode(net))
         result = {
-            "model_name": f"{meter_type_name} ({data[CONF_HOST]}:{data[CONF_PORT]}@{data[CONF_SLAVE_IDS][0]})",
+            "model_name": f"{profile.model} ({location}@{data[CONF_SLAVE_IDS][0]})",
             "rev": rev,
-            CONF_PHASE_MODE: _resolve_ph_mode(net),
+            CONF_PHASE_MODE: profile.phase_mode,
         }
 
         # Return info that you want to store in the config entry.
         return result
 
     finally:
-        if client is not None:
-            # Cleanup this inverter object explicitly to prevent it from trying to maintain a modbus connection
-            client.close()
+        # closes the connection unless a running entry still uses the bus
+        await arbitrator.async_release(bus)
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -203,10 +243,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._password: str | None = None
         self._pm_phase_mode: str | None = None
         self._meter_type: str | None = None
+        self._passive = False
+        self._framer = FRAMER_TCP
 
         # Only used in reauth flows:
         self._reauth_entry: config_entries.ConfigEntry | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -239,13 +289,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
+            self._passive = user_input.get(CONF_PASSIVE, False)
             user_selection = user_input[CONF_PORT]
             if user_selection == CONF_MANUAL_PATH:
                 self._slave_ids = user_input[CONF_SLAVE_IDS]
                 return await self.async_step_setup_serial_manual_path()
 
             user_input[CONF_PORT] = await self.hass.async_add_executor_job(
-                usb.get_serial_by_id, user_input[CONF_PORT]
+                _serial_by_id, user_input[CONF_PORT]
             )
 
             try:
@@ -257,11 +308,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 try:
                     info = await validate_serial_setup(
+                        self.hass,
                         {
                             CONF_PORT: user_input[CONF_PORT],
                             CONF_SLAVE_IDS: user_input[CONF_SLAVE_IDS],
                             CONF_METER_TYPE: self._meter_type,
-                        }
+                            CONF_PASSIVE: self._passive,
+                        },
                     )
 
                 except SlaveException:
@@ -290,18 +343,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     return await self.async_step_pm_settings()
                     # return await self._create_entry()
 
-        ports = await self.hass.async_add_executor_job(serial.tools.list_ports.comports)
-        list_of_ports = {
-            port.device: usb.human_readable_device_name(
-                port.device,
-                port.serial_number,
-                port.manufacturer,
-                port.description,
-                port.vid,
-                port.pid,
-            )
-            for port in ports
-        }
+        list_of_ports = await self.hass.async_add_executor_job(_list_serial_ports)
 
         list_of_ports[CONF_MANUAL_PATH] = CONF_MANUAL_PATH
 
@@ -309,6 +351,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             {
                 vol.Required(CONF_PORT): vol.In(list_of_ports),
                 vol.Required(CONF_SLAVE_IDS, default=str(DEFAULT_SERIAL_SLAVE_ID)): str,
+                # another master (e.g. an inverter) already polls the meter
+                vol.Optional(CONF_PASSIVE, default=False): bool,
             }
         )
         return self.async_show_form(
@@ -333,11 +377,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 try:
                     info = await validate_serial_setup(
+                        self.hass,
                         {
                             CONF_PORT: user_input[CONF_PORT],
                             CONF_SLAVE_IDS: user_input[CONF_SLAVE_IDS],
                             CONF_METER_TYPE: self._meter_type,
-                        }
+                            CONF_PASSIVE: self._passive,
+                        },
                     )
 
                 except SlaveException:
@@ -392,12 +438,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 try:
                     info = await validate_network_setup(
+                        self.hass,
                         {
                             CONF_HOST: user_input[CONF_HOST],
                             CONF_PORT: user_input[CONF_PORT],
                             CONF_SLAVE_IDS: user_input[CONF_SLAVE_IDS],
                             CONF_METER_TYPE: self._meter_type,
-                        }
+                            CONF_FRAMER: user_input[CONF_FRAMER],
+                        },
                     )
 
                 except SlaveException:
@@ -413,6 +461,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                     self._host = user_input[CONF_HOST]
                     self._port = user_input[CONF_PORT]
+                    self._framer = user_input[CONF_FRAMER]
                     self._slave_ids = user_input[CONF_SLAVE_IDS]
 
                     self._info = info
@@ -479,6 +528,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             CONF_PHASE_MODE: self._pm_phase_mode,
             CONF_METER_TYPE: self._meter_type,
         }
+        if self._passive:
+            data[CONF_PASSIVE] = True
+        if self._host is not None:
+            data[CONF_FRAMER] = self._framer
 
         if self._reauth_entry:
             self.hass.config_entries.async_update_entry(self._reauth_entry, data=data)
@@ -488,5 +541,50 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_create_entry(title=self._info["model_name"], data=data)
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle chint pm options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_CAPTURE_RAW, default=options.get(CONF_CAPTURE_RAW, False)
+                ): bool,
+                vol.Required(
+                    CONF_CAPTURE_MAX_SIZE,
+                    default=options.get(
+                        CONF_CAPTURE_MAX_SIZE, DEFAULT_CAPTURE_MAX_SIZE
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1024)),
+                # 0 disables the modbus tcp proxy
+                vol.Required(
+                    CONF_PROXY_PORT, default=options.get(CONF_PROXY_PORT, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+                # 0.0.0.0 or :: listens on all interfaces
+                vol.Required(
+                    CONF_PROXY_HOST,
+                    default=options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+                ): _listen_address,
+                vol.Required(
+                    CONF_PROXY_MAX_AGE,
+                    default=options.get(CONF_PROXY_MAX_AGE, DEFAULT_PROXY_MAX_AGE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                # upper bound of the read size learned per gateway
+                vol.Required(
+                    CONF_MAX_READ_COUNT,
+                    default=options.get(CONF_MAX_READ_COUNT, MAX_READ_COUNT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=2, max=MAX_READ_COUNT)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+
 class SlaveException(Exception):
     """Error while testing communication with a slave."""
@@ -1,4 +1,5 @@
 """Constants for the Chint pm integration."""
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorStateClass,
@@ -22,11 +23,94 @@ DEFAULT_PASSWORD = ""
 CONF_SLAVE_IDS = "slave_ids"
 CONF_PHASE_MODE = "phase_mode"
 CONF_METER_TYPE = "meter_type"
+CONF_CAPTURE_RAW = "capture_raw"
+CONF_CAPTURE_MAX_SIZE = "capture_max_size"
+CONF_PASSIVE = "passive"
+CONF_FRAMER = "framer"
+CONF_PROXY_HOST = "proxy_host"
+CONF_PROXY_PORT = "proxy_port"
+CONF_PROXY_MAX_AGE = "proxy_max_age"
+CONF_MAX_READ_COUNT = "max_read_count"
 
 DATA_UPDATE_COORDINATORS = "update_coordinators"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_ARBITRATOR = f"{DOMAIN}_arbitrator"
+DATA_PROXIES = f"{DOMAIN}_proxies"
+DATA_PROXY = "proxy"
 
 UPDATE_INTERVAL = timedelta(seconds=15)
 
+SERIAL_BAUDRATE = 9600
+
+# framing of network transports: modbus tcp (MBAP) or RTU frames passed
+# through by a transparent serial server
+FRAMER_TCP = "tcp"
+FRAMER_RTU_OVER_TCP = "rtu_over_tcp"
+# seconds over which the bus utilisation is measured
+BUS_UTILISATION_WINDOW = 60
+
+# attempts per register block and cycle after the first one, as long as the
+# meter spent less than the budget (seconds) on the bus in this cycle
+BLOCK_RETRIES = 2
+BLOCK_RETRY_BUDGET = 10
+
+# seconds a request waits for its response; requests are retried per block,
+# never within pymodbus, so a silent slave holds a shared line only this long
+SERIAL_TIMEOUT = 1
+NETWORK_TIMEOUT = 2
+
+# listen-only serial mode: seconds sniffed values are collected before they
+# are published, seconds without traffic before the meter is unavailable,
+# seconds between attempts to reopen the port and the silence after which a
+# partial frame is dropped
+SNIFF_PUBLISH_INTERVAL = 5
+SNIFF_TIMEOUT = 60
+SNIFF_RECONNECT_DELAY = 10
+SNIFF_RESYNC_TIMEOUT = 0.1
+
+# address the modbus tcp proxy listens on, 0.0.0.0 or :: for all interfaces
+DEFAULT_PROXY_HOST = "127.0.0.1"
+# seconds cached registers are served by the modbus tcp proxy before they are
+# read through
+DEFAULT_PROXY_MAX_AGE = 20
+
+# read cost model: share of its weight a sample loses with every newer one,
+# reads before the fitted costs replace the prior, and the time a meter
+# takes to start answering (prior of serial lines)
+READ_COST_DECAY = 0.02
+READ_COST_MIN_SAMPLES = 10
+METER_RESPONSE_TIME = 0.02
+# prior of a modbus tcp gateway, fixed seconds per read and per register
+TCP_READ_COST = (0.02, 0.00001)
+# read size learning: cycles in which reads of a size go unanswered while
+# smaller ones are answered before the size is given up, and seconds after
+# which the configured size is tried again
+READ_LOSS_LIMIT = 3
+READ_LIMIT_RETRY_INTERVAL = 86400
+
+# round trip times kept per slave and transport for the mean and p95
+RTT_SAMPLES = 128
+
+# bus priority classes, lower runs first
+PRIORITY_CONTROL = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_POLL = 2
+
+# rolling demand windows in seconds
+DEMAND_WINDOWS = (900, 1800, 3600)
+# samples further apart are not integrated
+DEMAND_MAX_GAP = 300
+# share of a window that must be covered by samples to report its demand
+DEMAND_MIN_COVERAGE = 0.9
+
+# seconds a change of the persisted state is held back before it is written
+SAVE_DELAY = 60
+
+CAPTURE_DIR = "chint_pm_capture"
+CAPTURE_BACKUP_COUNT = 2
+# MiB per capture file before it is rotated
+DEFAULT_CAPTURE_MAX_SIZE = 16
+
 PHMODE_3P4W = "3P4W"
 PHMODE_3P3W = "3P3W"
 
@@ -0,0 +1,799 @@
+"""Polling of the Chint pm meters."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import timedelta
+from functools import cached_property
+import logging
+import math
+import threading
+import time
+from typing import Any, TypeVar
+
+# Use asyncio.timeout instead of async_timeout
+from pymodbus.exceptions import ConnectionException, ModbusException
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .bus import BusClient, ModbusBus, async_get_arbitrator, is_unanswered
+from .capture import RegisterCaptureLog
+from .const import (
+    BLOCK_RETRIES,
+    BLOCK_RETRY_BUDGET,
+    CONF_FRAMER,
+    CONF_MAX_READ_COUNT,
+    CONF_METER_TYPE,
+    CONF_PASSIVE,
+    CONF_PHASE_MODE,
+    CONF_SLAVE_IDS,
+    DOMAIN,
+    FRAMER_TCP,
+    PRIORITY_CONTROL,
+    PRIORITY_POLL,
+    SAVE_DELAY,
+    SNIFF_PUBLISH_INTERVAL,
+    SNIFF_TIMEOUT,
+)
+from .demand import DemandMeter
+from .profiles import get_profile
+from .registers import MAX_READ_COUNT, MeterSnapshot, RegisterCache
+from .sniffer import BusSniffer
+from .stats import LinkStats
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SNAPSHOT_STORAGE_VERSION = 1
+
+# step of the poll phase shifts between transports
+_GOLDEN_RATIO_CONJUGATE = (math.sqrt(5) - 1) / 2
+
+
+class ChintDxsuDevice:
+    """Chint pm device object"""
+
+    def __init__(self, hass, entry, scan_interval) -> None:
+        """Initialize the Modbus hub."""
+        self._hass = hass
+        self._entry = entry
+        self._lock = threading.Lock()
+        self._scan_interval = scan_interval
+        self._unsub_interval_method = None
+        self._sensors = []
+        # shared by every entry of the same meter type and phase mode
+        self.profile = get_profile(
+            entry.data[CONF_METER_TYPE], entry.data[CONF_PHASE_MODE]
+        )
+        self.register_map = self.profile.register_map
+        self.data = self.register_map.empty_snapshot()
+        # everything is read until the entities tell what they need
+        self.read_plan = self.profile.read_plan
+        self.capture: RegisterCaptureLog | None = None
+        # read address -> error of the last cycle
+        self.block_errors: dict[int, str] = {}
+        # block addresses that must start a request of their own
+        self.read_breaks: set[int] = set()
+        # reads that went unanswered, the bus learns read sizes from them
+        self._unanswered = 0
+        # raw registers as last read, served by the modbus tcp proxy
+        self.registers = RegisterCache()
+
+    async def _read_holding_registers(self, client, unit_id, address, count):
+        """read one register block, cache it and append it to the capture log"""
+        response = await client.read_holding_registers(
+            address=address, count=count, device_id=unit_id
+        )
+        if not response.isError():
+            self.registers.update(address, response.registers, time.monotonic())
+        if self.capture is not None and not response.isError():
+            if not self.capture.append(
+                time.time(), unit_id, address, response.registers
+            ):
+                await self._hass.async_add_executor_job(self.capture.rotate)
+                self.capture.append(time.time(), unit_id, address, response.registers)
+        return response
+
+    def restore(self, values: dict[str, Any], timestamp: float) -> None:
+        """restore the raw values of a cycle read before the last shutdown"""
+        restored = self.register_map.values_from(values)
+        self.data = MeterSnapshot(
+            self.register_map.index,
+            restored,
+            0,
+            timestamp,
+            self.profile.scaling.apply(restored),
+        )
+
+    def merge(self, values: dict[int, Any], timestamp: float) -> MeterSnapshot:
+        """return a snapshot with the raw values of some positions replaced"""
+        merged = list(self.data.values)
+        for slot, value in values.items():
+            merged[slot] = value
+        merged = tuple(merged)
+        return MeterSnapshot(
+            self.register_map.index,
+            merged,
+            self.data.seq + 1,
+            timestamp,
+            self.profile.scaling.apply(merged),
+        )
+
+    async def update(self, client, unit_id) -> MeterSnapshot:
+        """read one cycle and return it as a new snapshot"""
+        return await self._read_blocks(client, unit_id, self.read_plan)
+
+    async def _read_blocks(self, client, unit_id, plan):
+        """read and decode the blocks of a read plan into a new snapshot
+
+        Every request of the plan is read and retried on its own. Blocks
+        whose request still fails keep their values of the previous cycle,
+        are recorded in block_errors and their positions are marked failed in
+        the snapshot; the cycle only fails as a whole when no block could be
+        read. A request merging several blocks that the meter answers with an
+        exception is not retried as is: its blocks are read one by one and
+        the merge is added to read_breaks, so it is not planned again.
+
+        Unanswered reads of a meter that has not answered anything in the
+        cycle yet are not retried right away. After the first one the meter is
+        probed with a read of a single register, which a gateway dropping
+        large reads still passes on; if that goes unanswered too the cycle is
+        given up, so a dead meter holds a shared bus only briefly, otherwise
+        the read is retried as usual.
+
+        The first read of a cycle that goes unanswered while a smaller one was
+        answered is reported to the bus, which learns from that the largest
+        read its gateway passes on.
+        """
+        if not client.connected:
+            raise ConnectionException(f"{self._entry.title}: not connected")
+
+        clock = _wire_clock(client)
+        deadline = clock() + BLOCK_RETRY_BUDGET
+        errors: dict[int, str] = {}
+        results: list[list[int] | None] = []
+        # block position -> registers of blocks read on their own
+        separate: dict[int, list[int] | None] = {}
+        answered = False
+        # fewest registers of a read answered in this cycle, and whether the
+        # cycle reported a lost read to the bus
+        smallest: int | None = None
+        reported = False
+        for (address, count), members in zip(plan.reads, plan.members):
+            unanswered = self._unanswered
+            registers, rejected = await self._read_range(
+                client,
+                unit_id,
+                address,
+                count,
+                deadline if answered else clock(),
+                errors,
+                len(members) > 1,
+            )
+            if self._unanswered != unanswered and not answered:
+                probe, _ = await self._read_range(
+                    client, unit_id, address, 1, clock(), {}
+                )
+                if probe is None:
+                    raise ModbusException(f"no response: {errors[address]}")
+                answered = True
+                smallest = 1
+                # the meter is there, the read gets its retries after all
+                unanswered = self._unanswered
+                registers, rejected = await self._read_range(
+                    client,
+                    unit_id,
+                    address,
+                    count,
+                    deadline,
+                    errors,
+                    len(members) > 1,
+                )
+            if self._unanswered == unanswered:
+                answered = True
+                if registers is not None and (smallest is None or count < smallest):
+                    smallest = count
+            elif smallest is not None and smallest < count and not reported:
+                # smaller reads are answered, maybe not reads this large;
+                # told right away, a failing cycle must not lose it
+                reported = True
+                _read_lost(client, count)
+            if rejected:
+                _LOGGER.info(
+                    "%s: merged read %#06x+%s rejected (%s), reading its blocks"
+                    " separately",
+                    self._entry.title,
+                    address,
+                    count,
+                    errors.pop(address),
+                )
+                self.read_breaks.update(plan.blocks[p].address for p in members[1:])
+                for position in members:
+                    block = plan.blocks[position]
+                    separate[position], _ = await self._read_range(
+                        client, unit_id, block.address, block.count, deadline, errors
+                    )
+            results.append(registers)
+
+        decoded = []
+        for position, (block, parts) in enumerate(zip(plan.blocks, plan.parts)):
+            if position in separate:
+                registers = separate[position]
+            elif len(parts) == 1:
+                read, offset, count = parts[0]
+                registers = results[read]
+                if registers is not None and (offset or count != len(registers)):
+                    registers = registers[offset : offset + count]
+            else:
+                registers = []
+                for read, offset, count in parts:
+                    if results[read] is None:
+                        registers = None
+                        break
+                    registers.extend(results[read][offset : offset + count])
+            decoded.append(None if registers is None else block.decode(registers))
+
+        self._log_block_errors(errors)
+        if plan.blocks and all(block_values is None for block_values in decoded):
+            raise ModbusException(
+                "; ".join(
+                    f"{address:#06x}: {error}" for address, error in errors.items()
+                )
+            )
+
+        values = list(self.data.values)
+        for slot in plan.unread:
+            values[slot] = None
+        failed: list[int] = []
+        for slots, block_values in zip(plan.slots, decoded):
+            if block_values is None:
+                failed.extend(slots)
+                continue
+            for slot, value in zip(slots, block_values):
+                values[slot] = value
+
+        values = tuple(values)
+        return MeterSnapshot(
+            self.register_map.index,
+            values,
+            self.data.seq + 1,
+            time.time(),
+            # scaled once per cycle for all entities
+            self.profile.scaling.apply(values),
+            frozenset(failed),
+        )
+
+    async def _read_range(
+        self, client, unit_id, address, count, deadline, errors, split=False
+    ) -> tuple[list[int] | None, bool]:
+        """read a register range, retried while the cycle budget lasts
+
+        Returns the registers, or None after recording the last error if
+        every attempt failed. With split, an exception response is returned
+        right away as rejected instead of being retried. A range whose last
+        attempt went unanswered is counted in _unanswered.
+        """
+        lost = False
+        clock = _wire_clock(client)
+        for attempt in range(BLOCK_RETRIES + 1):
+            if attempt and clock() >= deadline:
+                break
+            try:
+                if not client.connected:
+                    # the bus closes the client after an I/O error
+                    await client.connect()
+                response = await self._read_holding_registers(
+                    client, unit_id, address, count
+                )
+            except (ModbusException, TimeoutError) as err:
+                errors[address] = str(err) or type(err).__name__
+                lost = is_unanswered(err)
+                continue
+            lost = False
+            if response.isError():
+                errors[address] = str(response)
+                if split:
+                    return None, True
+                continue
+            if len(response.registers) != count:
+                errors[address] = f"{len(response.registers)} of {count} registers"
+                continue
+            errors.pop(address, None)
+            return response.registers, False
+        self._unanswered += lost
+        return None, False
+
+    def _log_block_errors(self, errors: dict[int, str]) -> None:
+        # log changes only, a broken block would flood the log otherwise
+        for address, error in errors.items():
+            if address not in self.block_errors:
+                _LOGGER.warning(
+                    "%s: block %#06x failed, its entities are unavailable: %s",
+                    self._entry.title,
+                    address,
+                    error,
+                )
+        for address in self.block_errors.keys() - errors.keys():
+            _LOGGER.info("%s: block %#06x recovered", self._entry.title, address)
+        self.block_errors = errors
+
+    async def write(
+        self,
+        client,
+        unit_id: int,
+        registers: dict[int, int],
+        verify: Iterable[int] = (),
+        verify_unit_id: int | None = None,
+    ) -> dict[int, int]:
+        """write registers with function code 0x10 and read back verify
+
+        Contiguous registers are written with one request. The read back
+        addresses default to the same unit, after an address change they have
+        to be read from the new one.
+        """
+        for address, values in _register_runs(registers):
+            response = await client.write_registers(address, values, device_id=unit_id)
+            if response.isError():
+                raise ModbusException(
+                    f"writing {address:#06x}+{len(values)} failed: {response}"
+                )
+
+        read_back = {}
+        for address, values in _register_runs(dict.fromkeys(verify, 0)):
+            response = await self._read_holding_registers(
+                client, verify_unit_id or unit_id, address, len(values)
+            )
+            if response.isError():
+                raise ModbusException(
+                    f"reading back {address:#06x}+{len(values)} failed: {response}"
+                )
+            read_back.update(
+                zip(range(address, address + len(values)), response.registers)
+            )
+        return read_back
+
+
+def _register_runs(registers: dict[int, int]) -> list[tuple[int, list[int]]]:
+    """Group register values into runs of contiguous addresses."""
+    runs: list[tuple[int, list[int]]] = []
+    for address in sorted(registers):
+        if runs and runs[-1][0] + len(runs[-1][1]) == address:
+            runs[-1][1].append(registers[address])
+        else:
+            runs.append((address, [registers[address]]))
+    return runs
+
+
+class ChintUpdateCoordinator(DataUpdateCoordinator):
+    """A specialised DataUpdateCoordinator for chint smart meter."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        device: ChintDxsuDevice,
+        entry: ConfigEntry,
+        update_interval: timedelta | None = None,
+        update_method: Callable[[], Awaitable[T]] | None = None,
+        request_refresh_debouncer: Debouncer | None = None,
+    ) -> None:
+        """Create a ChintUpdateCoordinator."""
+        if entry.data[CONF_HOST] is None:
+            port_host = ""
+            port_name = str(entry.data[CONF_PORT])
+        else:
+            port_host = "".join(filter(str.isalnum, entry.data[CONF_HOST]))
+            port_name = "".join(filter(str.isalnum, str(entry.data[CONF_PORT])))
+
+        super().__init__(
+            hass,
+            logger,
+            name=f"{port_host}_{port_name}_{entry.data[CONF_SLAVE_IDS][0]}_data_update_coordinator",
+            update_interval=update_interval,
+            update_method=update_method,
+            request_refresh_debouncer=request_refresh_debouncer,
+        )
+        self.device = device
+        self._bus: ModbusBus | None = None
+        self._client: BusClient
+        # listen-only mode, another master polls the meter
+        self.passive: bool = entry.data.get(CONF_PASSIVE, False)
+        self._sniffer: BusSniffer | None = None
+        self._remove_listener: CALLBACK_TYPE | None = None
+        self._sniffed: dict[int, Any] = {}
+        self._sniffed_at = 0.0
+        self._publish_handle: asyncio.TimerHandle | None = None
+        self._traffic_handle: asyncio.TimerHandle | None = None
+        self._unit_id = entry.data[CONF_SLAVE_IDS][0]
+        self._entry = entry
+        self.transport_key = (entry.data[CONF_HOST], str(entry.data[CONF_PORT]))
+        # poll statistics, exported by the metrics view
+        self.poll_count = 0
+        self.poll_error_count = 0
+        self.last_poll_duration: float | None = None
+        self.demand = DemandMeter(hass, entry.entry_id)
+        self.link_stats = LinkStats()
+        self.snapshot_store = snapshot_store(hass, entry.entry_id)
+        self._power_slot = device.register_map.index["pt"]
+        # keys of the added entities, pt always feeds the demand
+        self._needed_keys: Counter[str] = Counter(("pt",))
+        # upper bound of the read size, the bus learns the actual one
+        self._max_read_count = entry.options.get(CONF_MAX_READ_COUNT, MAX_READ_COUNT)
+        # max gap, read breaks and read size the read plan was made with
+        self._plan_key: tuple[int | None, int, int] = (None, 0, MAX_READ_COUNT)
+
+    async def push_sensor_read(self, address, count, data_type):
+        # TODO: push device addresses to read
+        await self._client.read_holding_registers(
+            address=address, count=count, device_id=self._unit_id
+        )
+        self.device._sensors.append(1)
+
+    @callback
+    def async_register_keys(self, keys: Iterable[str]) -> CALLBACK_TYPE:
+        """Read the blocks of keys until the returned callback is called.
+
+        Disabled entities are never added, so only the blocks of enabled
+        entities end up in the read plan. Enabling or disabling an entity
+        reloads the entry, which starts again with a complete read.
+        """
+        keys = tuple(keys)
+        self._needed_keys.update(keys)
+        self._replan()
+
+        @callback
+        def _unregister() -> None:
+            self._needed_keys.subtract(keys)
+            self._replan()
+
+        return _unregister
+
+    def _replan(self) -> None:
+        # merging needs the read costs of a bus, a sniffer reads nothing
+        max_gap = self._bus.max_gap if self._bus is not None else None
+        max_count = self._bus.max_count if self._bus is not None else MAX_READ_COUNT
+        self._plan_key = (max_gap, len(self.device.read_breaks), max_count)
+        self.device.read_plan = self.device.register_map.plan(
+            {key for key, count in self._needed_keys.items() if count > 0},
+            max_gap,
+            self.device.read_breaks,
+            max_count,
+        )
+
+    async def create_client(self, port, host, client=None):
+        """attach the coordinator to the shared bus of its transport
+
+        A prebuilt client (e.g. a ReplayModbusClient) can be passed instead.
+        In listen-only mode the coordinator is attached to the sniffer of the
+        serial port instead and never sends anything.
+        """
+        arbitrator = async_get_arbitrator(self.hass)
+        try:
+            if self.passive:
+                self._sniffer = await arbitrator.async_acquire_sniffer(port)
+            else:
+                self._bus = await arbitrator.async_acquire(
+                    host,
+                    port,
+                    client,
+                    self._entry.data.get(CONF_FRAMER, FRAMER_TCP),
+                )
+        except ConnectionException as err:
+            raise ConfigEntryError(str(err)) from err
+        if self._sniffer is not None:
+            self._remove_listener = self._sniffer.async_add_listener(
+                self._unit_id, self
+            )
+            self._watch_traffic()
+            return
+        self._bus.limit_read_count(self._max_read_count)
+        self._client = BusClient(self._bus, self, stats=self.link_stats)
+
+    @callback
+    def async_handle_registers(
+        self, address: int, registers: list[int], timestamp: float
+    ) -> None:
+        """Take registers another master read from the meter.
+
+        The values of the responses are collected and published together,
+        at most every SNIFF_PUBLISH_INTERVAL seconds.
+        """
+        self.device.registers.update(address, registers, time.monotonic())
+        self._sniffed.update(self.device.register_map.decode_range(address, registers))
+        self._sniffed_at = timestamp
+        self._watch_traffic()
+        if self._publish_handle is None:
+            self._publish_handle = self.hass.loop.call_later(
+                SNIFF_PUBLISH_INTERVAL, self._async_publish_sniffed
+            )
+
+    @callback
+    def _async_publish_sniffed(self) -> None:
+        self._publish_handle = None
+        if not self._sniffed:
+            return
+        snapshot = self.device.merge(self._sniffed, self._sniffed_at)
+        self._sniffed = {}
+        self._handle_snapshot(snapshot)
+        self.async_set_updated_data(snapshot)
+
+    def _watch_traffic(self) -> None:
+        if self._traffic_handle is not None:
+            self._traffic_handle.cancel()
+        self._traffic_handle = self.hass.loop.call_later(
+            SNIFF_TIMEOUT, self._async_traffic_lost
+        )
+
+    @callback
+    def _async_traffic_lost(self) -> None:
+        self._traffic_handle = None
+        self.async_set_update_error(
+            UpdateFailed(f"No responses of the meter seen for {SNIFF_TIMEOUT} s")
+        )
+
+    async def _async_update_data(self):
+        if self._sniffer is not None:
+            # an update request must not send anything in listen-only mode
+            if self._traffic_handle is None:
+                raise UpdateFailed(
+                    f"No responses of the meter seen for {SNIFF_TIMEOUT} s"
+                )
+            return self.device.data
+
+        self.poll_count += 1
+        start = time.monotonic()
+        try:
+            # no overall timeout: it would run while other meters are served
+            # on the bus; every request has its own timeout and the retries
+            # are budgeted by the time of this meter on the wire
+            if not self._client.connected:
+                await self._client.connect()
+            self._bus.retry_read_limit()
+            if self._plan_key != (
+                self._bus.max_gap,
+                len(self.device.read_breaks),
+                self._bus.max_count,
+            ):
+                # the read costs or sizes changed or a merge was rejected
+                self._replan()
+            snapshot = await self.device.update(self._client, self._unit_id)
+        except Exception as err:
+            self.poll_error_count += 1
+            raise UpdateFailed(f"Could not update values: {err}") from err
+        finally:
+            self.last_poll_duration = time.monotonic() - start
+
+        self._handle_snapshot(snapshot)
+        return snapshot
+
+    def _handle_snapshot(self, snapshot: MeterSnapshot) -> None:
+        # readers only ever see complete cycles
+        self.device.data = snapshot
+        if (
+            power := snapshot.scaled[self._power_slot]
+        ) is not None and self._power_slot not in snapshot.failed:
+            self.demand.add_sample(snapshot.timestamp, power)
+            self.demand.async_schedule_save()
+        self.snapshot_store.async_delay_save(self._snapshot_data, SAVE_DELAY)
+
+    async def async_restore(self) -> None:
+        """Restore the last cycle and the demand saved before the shutdown.
+
+        The entities show the restored values right away; the scheduler
+        replaces them with live ones at its own pace.
+        """
+        await self.demand.async_load()
+        if data := await self.snapshot_store.async_load():
+            self.device.restore(data["values"], data["timestamp"])
+            # a limit learned under another configured one is learned anew
+            if (
+                self._bus is not None
+                and (limit := data.get("read_limit"))
+                and limit["configured"] == self._max_read_count
+            ):
+                self._bus.restore_read_count(
+                    limit["learned"], limit.get("largest_read", 0)
+                )
+
+    async def async_save(self) -> None:
+        """Save the last cycle and the demand now."""
+        if self.device.data.timestamp is not None:
+            await self.snapshot_store.async_save(self._snapshot_data())
+        await self.demand.async_save()
+
+    @callback
+    def _snapshot_data(self) -> dict[str, Any]:
+        data = {
+            "timestamp": self.device.data.timestamp,
+            "values": dict(self.device.data),
+        }
+        if self._bus is not None and self._bus.learn:
+            data["read_limit"] = {
+                "configured": self._max_read_count,
+                "learned": self._bus.learned_count,
+                "largest_read": self._bus.largest_read,
+            }
+        return data
+
+    async def async_write_registers(
+        self,
+        registers: dict[int, int],
+        verify: Iterable[int] = (),
+        verify_unit_id: int | None = None,
+    ) -> dict[int, int]:
+        """Write configuration registers ahead of any queued polling.
+
+        Returns the read back values of the verify addresses.
+        """
+        if self._sniffer is not None:
+            raise ModbusException(f"{self._entry.title} is listen-only")
+        client = BusClient(self._bus, self, PRIORITY_CONTROL, self.link_stats)
+        async with asyncio.timeout(30):
+            if not client.connected:
+                await client.connect()
+            return await self.device.write(
+                client, self._unit_id, registers, verify, verify_unit_id
+            )
+
+    async def async_read_registers(self, address: int, count: int):
+        """Read a register range for another client, queued with the polls.
+
+        Returns the response, which may be a modbus exception of the meter.
+        """
+        if self._sniffer is not None:
+            raise ModbusException(f"{self._entry.title} is listen-only")
+        client = BusClient(self._bus, self, PRIORITY_POLL, self.link_stats)
+        async with asyncio.timeout(10):
+            if not client.connected:
+                await client.connect()
+            return await self.device._read_holding_registers(
+                client, self._unit_id, address, count
+            )
+
+    @cached_property
+    def device_info(self) -> DeviceInfo:
+        """Return device information about this pm device."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry.entry_id)},
+            name=self._entry.title,
+            manufacturer="Chint",
+            model=self.device.profile.model,
+        )
+
+    @property
+    def bus_stats(self) -> LinkStats:
+        """Return the counters of the transport of this meter."""
+        if self._sniffer is not None:
+            return self._sniffer.stats
+        return self._bus.stats
+
+    async def stop(self):
+        """Release the shared bus or sniffer"""
+        for handle in (self._publish_handle, self._traffic_handle):
+            if handle is not None:
+                handle.cancel()
+        self._publish_handle = self._traffic_handle = None
+        if self._sniffer is not None:
+            self._remove_listener()
+            await async_get_arbitrator(self.hass).async_release_sniffer(self._sniffer)
+            return
+        await async_get_arbitrator(self.hass).async_release(self._bus)
+
+
+class PollScheduler:
+    """Domain wide poll schedule of all chint coordinators.
+
+    Every coordinator gets a fixed phase offset within the update interval.
+    The coordinators of a transport are spread evenly over the interval, and
+    every transport is shifted by another fraction of its spacing, so the
+    polls of different transports do not start together either. The schedule is redistributed whenever a coordinator is
+    added or removed; polls run at a fixed rate and never overlap per
+    coordinator.
+    """
+
+    def __init__(self, hass: HomeAssistant, interval: timedelta) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._interval = interval.total_seconds()
+        self._epoch = hass.loop.time()
+        self._transports: dict[tuple, list[ChintUpdateCoordinator]] = {}
+        self._offsets: dict[ChintUpdateCoordinator, float] = {}
+        self._handles: dict[ChintUpdateCoordinator, asyncio.TimerHandle] = {}
+        self._running: set[ChintUpdateCoordinator] = set()
+
+    @callback
+    def async_add(self, coordinator: ChintUpdateCoordinator) -> None:
+        """Add a coordinator to the schedule."""
+        self._transports.setdefault(coordinator.transport_key, []).append(coordinator)
+        self._replan()
+
+    @callback
+    def async_remove(self, coordinator: ChintUpdateCoordinator) -> None:
+        """Remove a coordinator from the schedule."""
+        transport = self._transports.get(coordinator.transport_key, [])
+        if coordinator in transport:
+            transport.remove(coordinator)
+            if not transport:
+                del self._transports[coordinator.transport_key]
+        if handle := self._handles.pop(coordinator, None):
+            handle.cancel()
+        self._offsets.pop(coordinator, None)
+        self._replan()
+
+    @callback
+    def async_shutdown(self, *_) -> None:
+        """Cancel all scheduled polls."""
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        self._transports.clear()
+        self._offsets.clear()
+
+    def offset(self, coordinator: ChintUpdateCoordinator) -> float | None:
+        """Return the phase offset of a coordinator in seconds."""
+        return self._offsets.get(coordinator)
+
+    def _replan(self) -> None:
+        # the i-th of n coordinators of the k-th transport polls at
+        # (i + shift_k) * interval / n; the golden ratio steps of the shifts
+        # keep transports of different sizes from meeting at common fractions
+        now = self._hass.loop.time()
+        for index, transport in enumerate(self._transports.values()):
+            shift = index * _GOLDEN_RATIO_CONJUGATE % 1
+            for position, coordinator in enumerate(transport):
+                self._offsets[coordinator] = (
+                    self._interval * (position + shift) / len(transport)
+                )
+                if handle := self._handles.pop(coordinator, None):
+                    handle.cancel()
+                self._schedule(coordinator, now)
+
+    def _schedule(self, coordinator: ChintUpdateCoordinator, now: float) -> None:
+        phase = self._epoch + self._offsets[coordinator]
+        cycles = math.floor((now - phase) / self._interval) + 1
+        self._handles[coordinator] = self._hass.loop.call_at(
+            phase + cycles * self._interval, self._poll, coordinator
+        )
+
+    @callback
+    def _poll(self, coordinator: ChintUpdateCoordinator) -> None:
+        self._schedule(coordinator, self._hass.loop.time())
+        if coordinator in self._running:
+            _LOGGER.debug("%s: previous poll still running, skipped", coordinator.name)
+            return
+        self._running.add(coordinator)
+        self._hass.async_create_background_task(
+            self._async_refresh(coordinator), f"{coordinator.name} poll"
+        )
+
+    async def _async_refresh(self, coordinator: ChintUpdateCoordinator) -> None:
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._running.discard(coordinator)
+
+
+def _wire_clock(client) -> Callable[[], float]:
+    """Return the clock the retries of a cycle on client are budgeted by."""
+    return client.wire_time if isinstance(client, BusClient) else time.monotonic
+
+
+def _read_lost(client, count: int) -> None:
+    """Tell the bus of client, if any, that reads of count went unanswered."""
+    if isinstance(client, BusClient):
+        client.read_lost(count)
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store of the last cycle of an entry."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
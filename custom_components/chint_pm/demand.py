@@ -0,0 +1,187 @@
+"""Sliding window demand of the Chint pm meters."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEMAND_MAX_GAP,
+    DEMAND_MIN_COVERAGE,
+    DEMAND_WINDOWS,
+    DOMAIN,
+    SAVE_DELAY,
+)
+
+STORAGE_VERSION = 1
+
+
+def billing_period(timestamp: float) -> str:
+    """Return the billing period (local calendar month) of a timestamp."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    return f"{local.year}-{local.month:02d}"
+
+
+class DemandMeter:
+    """Rolling average demand and billing period peaks from sampled power.
+
+    Consecutive samples form segments holding their duration and energy
+    (trapezoidal). The segments live in a ring buffer that covers the longest
+    window; every window keeps its own tail position and running sums, so a
+    sample costs constant work per window (amortised over the evicted
+    segments). Gaps longer than DEMAND_MAX_GAP are not bridged, the demand is
+    the average over the time actually covered by samples.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        windows: tuple[int, ...] = DEMAND_WINDOWS,
+    ) -> None:
+        """Initialize the demand meter."""
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.demand.{entry_id}")
+        self.windows = windows
+        capacity = 64
+        self._ends = [0.0] * capacity
+        self._durations = [0.0] * capacity
+        self._energies = [0.0] * capacity
+        # absolute segment numbers, the ring position is number % capacity
+        self._count = 0
+        self._tails = [0] * len(windows)
+        self._covered = [0.0] * len(windows)
+        self._energy = [0.0] * len(windows)
+        self._last: tuple[float, float] | None = None
+        self.period: str | None = None
+        self.peaks: list[tuple[float, float] | None] = [None] * len(windows)
+
+    def demand(self, window: int) -> float | None:
+        """Return the average power of a window, None until it is covered."""
+        index = self.windows.index(window)
+        if self._covered[index] < window * DEMAND_MIN_COVERAGE:
+            return None
+        return self._energy[index] / self._covered[index]
+
+    def peak(self, window: int) -> tuple[float, float] | None:
+        """Return the peak demand of a window in this period and its time."""
+        return self.peaks[self.windows.index(window)]
+
+    def add_sample(self, timestamp: float, power: float) -> None:
+        """Add a power sample (W)."""
+        if self._last is not None:
+            last_timestamp, last_power = self._last
+            duration = timestamp - last_timestamp
+            if duration <= 0:
+                # out of order or duplicate
+                return
+            if duration <= DEMAND_MAX_GAP:
+                self._push(timestamp, duration, (last_power + power) / 2 * duration)
+        self._last = (timestamp, power)
+
+        for index, window in enumerate(self.windows):
+            self._evict(index, timestamp - window)
+
+        period = billing_period(timestamp)
+        if period != self.period:
+            self.period = period
+            self.peaks = [None] * len(self.windows)
+        for index, window in enumerate(self.windows):
+            demand = self.demand(window)
+            peak = self.peaks[index]
+            if demand is not None and (peak is None or demand > peak[0]):
+                self.peaks[index] = (demand, timestamp)
+
+    def _push(self, end: float, duration: float, energy: float) -> None:
+        capacity = len(self._ends)
+        if self._count - min(self._tails) >= capacity:
+            self._grow()
+            capacity = len(self._ends)
+        position = self._count % capacity
+        self._ends[position] = end
+        self._durations[position] = duration
+        self._energies[position] = energy
+        self._count += 1
+        for index in range(len(self.windows)):
+            self._covered[index] += duration
+            self._energy[index] += energy
+
+    def _grow(self) -> None:
+        capacity = len(self._ends)
+        start = min(self._tails)
+        live = range(start, self._count)
+        ends = [self._ends[number % capacity] for number in live]
+        durations = [self._durations[number % capacity] for number in live]
+        energies = [self._energies[number % capacity] for number in live]
+        capacity *= 2
+        self._ends = [0.0] * capacity
+        self._durations = [0.0] * capacity
+        self._energies = [0.0] * capacity
+        for number, end, duration, energy in zip(live, ends, durations, energies):
+            self._ends[number % capacity] = end
+            self._durations[number % capacity] = duration
+            self._energies[number % capacity] = energy
+
+    def _evict(self, index: int, start: float) -> None:
+        capacity = len(self._ends)
+        tail = self._tails[index]
+        while tail < self._count and self._ends[tail % capacity] <= start:
+            self._covered[index] -= self._durations[tail % capacity]
+            self._energy[index] -= self._energies[tail % capacity]
+            tail += 1
+        self._tails[index] = tail
+        if tail == self._count:
+            # no rounding drift once the window is empty
+            self._covered[index] = self._energy[index] = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        capacity = len(self._ends)
+        return {
+            "windows": list(self.windows),
+            "period": self.period,
+            "peaks": [list(peak) if peak else None for peak in self.peaks],
+            "last": list(self._last) if self._last else None,
+            "segments": [
+                [
+                    self._ends[number % capacity],
+                    self._durations[number % capacity],
+                    self._energies[number % capacity],
+                ]
+                for number in range(min(self._tails), self._count)
+            ],
+        }
+
+    def _restore(self, data: dict[str, Any]) -> None:
+        if data.get("windows") != list(self.windows):
+            return
+        for end, duration, energy in data["segments"]:
+            self._push(end, duration, energy)
+        if data["last"]:
+            self._last = tuple(data["last"])
+            # the segments were pushed into every window, trim the shorter
+            # ones as the last sample did
+            for index, window in enumerate(self.windows):
+                self._evict(index, self._last[0] - window)
+        self.period = data["period"]
+        self.peaks = [tuple(peak) if peak else None for peak in data["peaks"]]
+
+    async def async_load(self) -> None:
+        """Restore the state saved before the last shutdown."""
+        if data := await self._store.async_load():
+            self._restore(data)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the state after a delay."""
+        self._store.async_delay_save(self.as_dict, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the state now."""
+        await self._store.async_save(self.as_dict())
+
+    async def async_remove(self) -> None:
+        """Remove the saved state."""
+        await self._store.async_remove()
@@ -0,0 +1,195 @@
+"""Prometheus metrics endpoint for the Chint pm integration."""
+
+from __future__ import annotations
+
+import math
+from weakref import WeakKeyDictionary
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_SLAVE_IDS,
+    DATA_ARBITRATOR,
+    DATA_PROXIES,
+    DATA_UPDATE_COORDINATORS,
+    DOMAIN,
+)
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+_FAMILIES = (
+    ("chint_pm_value", "gauge", "Raw meter value as read from the registers."),
+    ("chint_pm_polls_total", "counter", "Number of poll cycles."),
+    ("chint_pm_poll_errors_total", "counter", "Number of failed poll cycles."),
+    ("chint_pm_poll_duration_seconds", "gauge", "Duration of the last poll cycle."),
+    ("chint_pm_up", "gauge", "Whether the last poll cycle succeeded."),
+    ("chint_pm_bus_utilisation", "gauge", "Busy share of the bus (0..1)."),
+    ("chint_pm_bus_transactions_total", "counter", "Transactions on the bus."),
+    ("chint_pm_link_requests_total", "counter", "Modbus requests sent."),
+    ("chint_pm_link_errors_total", "counter", "Failed Modbus requests by type."),
+    ("chint_pm_link_reconnects_total", "counter", "Reconnects of the transport."),
+    ("chint_pm_link_rtt_seconds", "gauge", "Recent round trip time."),
+    ("chint_pm_proxy_requests_total", "counter", "Reads served by the proxy."),
+    ("chint_pm_bus_read_cost_seconds", "gauge", "Estimated read cost of the bus."),
+    ("chint_pm_bus_max_read_count", "gauge", "Registers per read of the bus."),
+)
+_ERROR_TYPES = (
+    ("timeout", "timeouts"),
+    ("framing", "framing_errors"),
+    ("connection", "connection_errors"),
+    ("other", "errors"),
+)
+_HEADERS = tuple(
+    f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n"
+    for name, metric_type, help_text in _FAMILIES
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str | None:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return None
+
+
+class _LabelCache:
+    """Pre-rendered sample prefixes of one coordinator."""
+
+    def __init__(self, coordinator) -> None:
+        entry = coordinator.config_entry
+        labels = (
+            f'entry_id="{_escape(entry.entry_id)}",'
+            f'name="{_escape(entry.title)}",'
+            f'slave="{entry.data[CONF_SLAVE_IDS][0]}"'
+        )
+        self.labels = labels
+        self.polls = f"chint_pm_polls_total{{{labels}}} "
+        self.errors = f"chint_pm_poll_errors_total{{{labels}}} "
+        self.duration = f"chint_pm_poll_duration_seconds{{{labels}}} "
+        self.up = f"chint_pm_up{{{labels}}} "
+        self.values: dict[str, str] = {}
+
+    def value(self, key: str) -> str:
+        """Return the sample prefix for one data key."""
+        if (prefix := self.values.get(key)) is None:
+            prefix = self.values[key] = (
+                f'chint_pm_value{{{self.labels},key="{_escape(key)}"}} '
+            )
+        return prefix
+
+
+def _link_samples(labels: str, stats, families) -> None:
+    """Append the link counters of a slave or a bus."""
+    requests, errors, reconnects, rtt = families
+    requests.append(f"chint_pm_link_requests_total{{{labels}}} {stats.requests}\n")
+    for error_type, attribute in _ERROR_TYPES:
+        errors.append(
+            f'chint_pm_link_errors_total{{{labels},type="{error_type}"}}'
+            f" {getattr(stats, attribute)}\n"
+        )
+    for code, count in stats.exception_codes.items():
+        errors.append(
+            f'chint_pm_link_errors_total{{{labels},type="exception",code="{code}"}}'
+            f" {count}\n"
+        )
+    reconnects.append(
+        f"chint_pm_link_reconnects_total{{{labels}}} {stats.reconnects}\n"
+    )
+    for stat, value in (("mean", stats.rtt_mean), ("p95", stats.rtt_p95)):
+        if value is not None:
+            rtt.append(
+                f'chint_pm_link_rtt_seconds{{{labels},stat="{stat}"}}' f" {value!r}\n"
+            )
+
+
+class ChintMetricsView(HomeAssistantView):
+    """Expose meter values and poll statistics in Prometheus text format."""
+
+    url = "/api/chint_pm/metrics"
+    name = "api:chint_pm:metrics"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the metrics view."""
+        self._hass = hass
+        self._labels: WeakKeyDictionary = WeakKeyDictionary()
+
+    def _label_cache(self, coordinator) -> _LabelCache:
+        if (cache := self._labels.get(coordinator)) is None:
+            cache = self._labels[coordinator] = _LabelCache(coordinator)
+        return cache
+
+    def render(self) -> str:
+        """Render all loaded meters."""
+        families = tuple([header] for header in _HEADERS)
+        values, polls, errors, durations, up, utilisation, transactions = families[:7]
+        link = families[7:11]
+        proxy_requests, read_cost, max_read_count = families[11:]
+        for entry_data in self._hass.data.get(DOMAIN, {}).values():
+            for coordinator in entry_data[DATA_UPDATE_COORDINATORS]:
+                cache = self._label_cache(coordinator)
+                polls.append(f"{cache.polls}{coordinator.poll_count}\n")
+                errors.append(f"{cache.errors}{coordinator.poll_error_count}\n")
+                if coordinator.last_poll_duration is not None:
+                    durations.append(
+                        f"{cache.duration}{coordinator.last_poll_duration!r}\n"
+                    )
+                up.append(f"{cache.up}{1 if coordinator.last_update_success else 0}\n")
+                for key, value in coordinator.device.data.items():
+                    if (sample := _format_value(value)) is not None:
+                        values.append(f"{cache.value(key)}{sample}\n")
+                _link_samples(cache.labels, coordinator.link_stats, link)
+        if arbitrator := self._hass.data.get(DATA_ARBITRATOR):
+            for bus in arbitrator.buses.values():
+                labels = f'{{bus="{_escape(bus.name)}"}} '
+                utilisation.append(
+                    f"chint_pm_bus_utilisation{labels}{bus.utilisation!r}\n"
+                )
+                transactions.append(
+                    f"chint_pm_bus_transactions_total{labels}{bus.transaction_count}\n"
+                )
+                _link_samples(f'bus="{_escape(bus.name)}"', bus.stats, link)
+                fixed, per_word = bus.cost.estimate
+                read_cost.append(
+                    f'chint_pm_bus_read_cost_seconds{{bus="{_escape(bus.name)}",'
+                    f'part="fixed"}} {fixed!r}\n'
+                    f'chint_pm_bus_read_cost_seconds{{bus="{_escape(bus.name)}",'
+                    f'part="per_register"}} {per_word!r}\n'
+                )
+                max_read_count.append(
+                    f"chint_pm_bus_max_read_count{labels}{bus.max_count}\n"
+                )
+            for sniffer in arbitrator.sniffers.values():
+                _link_samples(f'bus="{_escape(sniffer.name)}"', sniffer.stats, link)
+        for proxy in self._hass.data.get(DATA_PROXIES, {}).values():
+            for result, count in (
+                ("hit", proxy.hits),
+                ("read_through", proxy.read_throughs),
+                ("error", proxy.errors),
+            ):
+                proxy_requests.append(
+                    "chint_pm_proxy_requests_total"
+                    f'{{host="{_escape(proxy.host)}",port="{proxy.port}",'
+                    f'result="{result}"}} {count}\n'
+                )
+        return "".join("".join(family) for family in families)
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Serve the metrics."""
+        return web.Response(
+            body=self.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE_PROMETHEUS},
+        )
@@ -0,0 +1,920 @@
+"""Meter profiles of the Chint pm integration.
+
+A profile holds everything that differs between the supported meter
+models: the register map, the scaling of the raw values and the entity
+descriptions. Supporting another model means adding a profile here.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfEnergy,
+    UnitOfFrequency,
+    UnitOfPower,
+    UnitOfReactivePower,
+)
+from homeassistant.helpers.entity import EntityCategory
+
+from .const import PHMODE_3P3W, PHMODE_3P4W, MeterTypes
+from .registers import CT_3P_MAP, H_3P_MAP, ReadPlan, RegisterMap, ScalingTable
+
+
+@dataclass
+class ChintPmSensorEntityDescription(SensorEntityDescription):
+    """Chint PM Sensor Entity."""
+
+    phase_mode_relevant: str | None = None
+    address: int | None = None
+    count: int | None = None
+    data_type: str | None = None
+    # native value = round(raw * scale + offset, precision)
+    scale: float = 1.0
+    offset: float = 0.0
+    precision: int | None = None
+
+
+H_3P_DESCRIPTIONS: tuple[ChintPmSensorEntityDescription, ...] = (
+    ChintPmSensorEntityDescription(
+        key="rev",
+        name="Version",
+        icon="mdi:package-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ucode",
+        name="Programming password codE",
+        icon="mdi:form-textbox-password",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="clre",
+        name="Electric energy zero clearing CLr.E(1:zero clearing)",
+        icon="mdi:tune-vertical-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="net",
+        name="Connection mode net",
+        icon="mdi:tune-vertical-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="irat",
+        name="Current Transformer Ratio",
+        icon="mdi:information-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="urat",
+        name="Potential Transformer Ratio(*)",
+        icon="mdi:information-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        scale=0.1,
+    ),
+    ChintPmSensorEntityDescription(
+        key="meter_type",
+        name="Meter type",
+        icon="mdi:format-list-bulleted-type",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="protocol",
+        name="Protocol changing-over",
+        icon="mdi:electric-switch-closed",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="addr",
+        name="Communication address Addr",
+        icon="mdi:map-marker-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="baud",
+        name="Communication baud rate bAud",
+        icon="mdi:speedometer",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="secound",
+        name="Second",
+        icon="mdi:clock-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="minutes",
+        name="Minute",
+        icon="mdi:clock-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="hour",
+        name="Hour",
+        icon="mdi:clock-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="day",
+        name="Day",
+        icon="mdi:calendar-month-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="month",
+        name="Month",
+        icon="mdi:calendar-month-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="year",
+        name="Year",
+        icon="mdi:calendar-month-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    # electricity measurements
+    ChintPmSensorEntityDescription(
+        key="uab",
+        name="Line AB-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ubc",
+        name="Line BC-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="uca",
+        name="Line CA-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ua",
+        name="A-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ub",
+        name="B-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="uc",
+        name="C-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ia",
+        name="A phase current",
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ib",
+        name="B phase current",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ic",
+        name="C phase current",
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pt",
+        name="Conjunction active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pa",
+        name="A phase active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pb",
+        name="B phase active power",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pc",
+        name="C phase active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qt",
+        name="Conjunction reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qa",
+        name="A phase reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qb",
+        name="B phase reactive power",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qc",
+        name="C phase reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pft",
+        name="Conjunction power factor",
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfa",
+        name="A phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfb",
+        name="B phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfc",
+        name="C phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="freq",
+        name="Frequency",
+        icon="mdi:wave",
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        device_class=SensorDeviceClass.FREQUENCY,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="dmpt",
+        name="Total active power demand",
+        icon="mdi:home-lightning-bolt-outline",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="impep",
+        name="Positive active total energy",
+        icon="mdi:transmission-tower-export",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="expep",
+        name="Negative active total energy",
+        icon="mdi:transmission-tower-import",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q1eq",
+        name="Quadrant I reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q2eq",
+        name="Quadrant II reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q3eq",
+        name="Quadrant III reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q4eq",
+        name="Quadrant IV reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+)
+
+CT_3P_DESCRIPTIONS: tuple[ChintPmSensorEntityDescription, ...] = (
+    ChintPmSensorEntityDescription(
+        key="rev",
+        name="Version",
+        icon="mdi:package-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ucode",
+        name="Programming password codE",
+        icon="mdi:form-textbox-password",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="clre",
+        name="Electric energy zero clearing CLr.E(1:zero clearing)",
+        icon="mdi:tune-vertical-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="net",
+        name="Connection mode net",
+        icon="mdi:tune-vertical-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="irat",
+        name="Current Transformer Ratio",
+        icon="mdi:information-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="urat",
+        name="Potential Transformer Ratio(*)",
+        icon="mdi:information-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        scale=0.1,
+    ),
+    ChintPmSensorEntityDescription(
+        key="protocol",
+        name="Protocol changing-over",
+        icon="mdi:electric-switch-closed",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="addr",
+        name="Communication address Addr",
+        icon="mdi:map-marker-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    ChintPmSensorEntityDescription(
+        key="baud",
+        name="Communication baud rate bAud",
+        icon="mdi:speedometer",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    # electricity measurements
+    ChintPmSensorEntityDescription(
+        key="uab",
+        name="Line AB-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ubc",
+        name="Line BC-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="uca",
+        name="Line CA-line voltage",
+        phase_mode_relevant=PHMODE_3P3W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ua",
+        name="A-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ub",
+        name="B-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="uc",
+        name="C-phase voltage",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ia",
+        name="A phase current",
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ib",
+        name="B phase current",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="ic",
+        name="C phase current",
+        icon="mdi:current-ac",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pt",
+        name="Conjunction active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pa",
+        name="A phase active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pb",
+        name="B phase active power",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pc",
+        name="C phase active power",
+        icon="mdi:flash",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qt",
+        name="Conjunction reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qa",
+        name="A phase reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qb",
+        name="B phase reactive power",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="qc",
+        name="C phase reactive power",
+        icon="mdi:lightning-bolt-circle",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.1,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pft",
+        name="Conjunction power factor",
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfa",
+        name="A phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfb",
+        name="B phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="pfc",
+        name="C phase power factor",
+        phase_mode_relevant=PHMODE_3P4W,
+        icon="mdi:math-cos",
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        scale=0.001,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="freq",
+        name="Frequency",
+        icon="mdi:wave",
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        device_class=SensorDeviceClass.FREQUENCY,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=True,
+        scale=0.01,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="impep",
+        name="Positive active total energy",
+        icon="mdi:transmission-tower-export",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="expep",
+        name="Negative active total energy",
+        icon="mdi:transmission-tower-import",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q1eq",
+        name="Quadrant I reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q2eq",
+        name="Quadrant II reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q3eq",
+        name="Quadrant III reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+    ChintPmSensorEntityDescription(
+        key="q4eq",
+        name="Quadrant IV reactive total energy",
+        icon="mdi:",
+        native_unit_of_measurement="kVarh",
+        device_class=None,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        precision=2,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class MeterProfile:
+    """Register map, scaling and entities of one meter model."""
+
+    name: str
+    model: str
+    register_map: RegisterMap
+    descriptions: tuple[ChintPmSensorEntityDescription, ...]
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    """A profile with the phase mode of an entry applied.
+
+    Compiled once per (meter type, phase mode) and shared by every entry of
+    that kind.
+    """
+
+    profile: MeterProfile
+    phase_mode: str
+    descriptions: tuple[ChintPmSensorEntityDescription, ...]
+    # snapshot position of every description, None if it is not read
+    slots: tuple[int | None, ...]
+    # reads every block of the register map
+    read_plan: ReadPlan
+    # raw values to the native values of the descriptions
+    scaling: ScalingTable
+
+    @property
+    def model(self) -> str:
+        """Return the model name."""
+        return self.profile.model
+
+    @property
+    def register_map(self) -> RegisterMap:
+        """Return the register map."""
+        return self.profile.register_map
+
+
+PROFILES: dict[str, MeterProfile] = {
+    MeterTypes.METER_TYPE_H_3P: MeterProfile(
+        name="DTSU666-H (Huawei)",
+        model="DTSU-666-H",
+        register_map=H_3P_MAP,
+        descriptions=H_3P_DESCRIPTIONS,
+    ),
+    MeterTypes.METER_TYPE_CT_3P: MeterProfile(
+        name="DTSU666 (Normal)",
+        model="DTSU-666",
+        register_map=CT_3P_MAP,
+        descriptions=CT_3P_DESCRIPTIONS,
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def get_profile(meter_type: str, phase_mode: str) -> CompiledProfile:
+    """Return the compiled profile of a meter type and phase mode."""
+    profile = PROFILES.get(meter_type, PROFILES[MeterTypes.METER_TYPE_H_3P])
+    descriptions = tuple(
+        (
+            replace(description, entity_registry_enabled_default=True)
+            if description.phase_mode_relevant == phase_mode
+            else description
+        )
+        for description in profile.descriptions
+    )
+    index = profile.register_map.index
+    slots = tuple(index.get(description.key) for description in descriptions)
+    return CompiledProfile(
+        profile=profile,
+        phase_mode=phase_mode,
+        descriptions=descriptions,
+        slots=slots,
+        read_plan=profile.register_map.plan(),
+        scaling=ScalingTable(
+            (slot, description.scale, description.offset, description.precision)
+            for description, slot in zip(descriptions, slots)
+            if slot is not None
+        ),
+    )
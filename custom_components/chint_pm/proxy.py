@@ -0,0 +1,234 @@
+"""Modbus TCP proxy serving the cached registers of the Chint pm meters."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+import time
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DATA_PROXIES
+
+_LOGGER = logging.getLogger(__name__)
+
+READ_HOLDING_REGISTERS = 0x03
+# modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_VALUE = 0x03
+GATEWAY_PATH_UNAVAILABLE = 0x0A
+GATEWAY_TARGET_FAILED = 0x0B
+
+_MBAP = struct.Struct(">HHHB")
+
+
+class ModbusTcpProxy:
+    """A Modbus TCP server answering read holding registers for the meters.
+
+    Every meter is served under its own unit id. Reads are answered from the
+    raw registers the coordinator read last; a range that was not read or is
+    older than the max age of the meter is read through the bus of the meter
+    and cached. Read throughs queue with the polls of the meter, one at a
+    time per meter, and a range the meter refused is refused again until the
+    max age passed, so clients cannot crowd the bus. Nothing but reads is
+    served, so other clients cannot change the meters.
+    """
+
+    def __init__(self, hass: HomeAssistant, host: str, port: int) -> None:
+        """Initialize the proxy."""
+        self._hass = hass
+        self.host = host
+        self.port = port
+        # unit id -> coordinator and max age in seconds
+        self._units: dict[int, tuple[Any, float]] = {}
+        # unit id -> lock held while a range of the meter is read through
+        self._locks: dict[int, asyncio.Lock] = {}
+        # (unit id, address, count) -> monotonic time and exception response
+        self._refused: dict[tuple[int, int, int], tuple[float, bytes]] = {}
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.users = 0
+        # statistics, exported by the metrics view
+        self.hits = 0
+        self.read_throughs = 0
+        self.errors = 0
+
+    async def async_start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(
+            self._handle_client, host=self.host, port=self.port
+        )
+
+    async def async_close(self) -> None:
+        """Stop listening and close the client connections."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @callback
+    def async_add_unit(
+        self, unit_id: int, coordinator, max_age: float
+    ) -> CALLBACK_TYPE:
+        """Serve a meter under unit_id until the returned callback is called."""
+        if unit_id in self._units:
+            _LOGGER.warning(
+                "Unit id %s is already served on port %s, %s is not proxied",
+                unit_id,
+                self.port,
+                coordinator.name,
+            )
+            return lambda: None
+        self._units[unit_id] = (coordinator, max_age)
+
+        @callback
+        def _remove() -> None:
+            if self._units.get(unit_id, (None,))[0] is coordinator:
+                del self._units[unit_id]
+                self._locks.pop(unit_id, None)
+                for key in [key for key in self._refused if key[0] == unit_id]:
+                    del self._refused[key]
+
+        return _remove
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                transaction_id, protocol_id, length, unit_id = _MBAP.unpack(
+                    await reader.readexactly(_MBAP.size)
+                )
+                if protocol_id != 0 or not 2 <= length <= 254:
+                    # not modbus, the stream cannot be resynchronised
+                    break
+                pdu = await reader.readexactly(length - 1)
+                response = await self._respond(unit_id, pdu)
+                writer.write(
+                    _MBAP.pack(transaction_id, 0, len(response) + 1, unit_id) + response
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, unit_id: int, pdu: bytes) -> bytes:
+        function = pdu[0]
+        if function != READ_HOLDING_REGISTERS:
+            return bytes((function | 0x80, ILLEGAL_FUNCTION))
+        if len(pdu) != 5:
+            return bytes((function | 0x80, ILLEGAL_DATA_VALUE))
+        address, count = struct.unpack_from(">HH", pdu, 1)
+        if not 1 <= count <= 125:
+            return bytes((function | 0x80, ILLEGAL_DATA_VALUE))
+        if (unit := self._units.get(unit_id)) is None:
+            return bytes((function | 0x80, GATEWAY_PATH_UNAVAILABLE))
+
+        coordinator, max_age = unit
+        registers = coordinator.device.registers.get(
+            address, count, max_age, time.monotonic()
+        )
+        if registers is None:
+            if (lock := self._locks.get(unit_id)) is None:
+                lock = self._locks[unit_id] = asyncio.Lock()
+            async with lock:
+                # a read through of the clients queued ahead may have read it
+                registers = coordinator.device.registers.get(
+                    address, count, max_age, time.monotonic()
+                )
+                if registers is None:
+                    return await self._read_through(
+                        unit_id, coordinator, max_age, function, address, count
+                    )
+        self.hits += 1
+        return struct.pack(f">BB{count}H", function, 2 * count, *registers)
+
+    async def _read_through(
+        self,
+        unit_id: int,
+        coordinator,
+        max_age: float,
+        function: int,
+        address: int,
+        count: int,
+    ) -> bytes:
+        key = (unit_id, address, count)
+        if (refused := self._refused.get(key)) is not None:
+            if time.monotonic() - refused[0] < max_age:
+                self.errors += 1
+                return refused[1]
+            del self._refused[key]
+        self.read_throughs += 1
+        try:
+            response = await coordinator.async_read_registers(address, count)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug(
+                "%s: read through of %#06x+%s failed: %s",
+                coordinator.name,
+                address,
+                count,
+                err,
+            )
+            self.errors += 1
+            return bytes((function | 0x80, GATEWAY_TARGET_FAILED))
+        if response.isError():
+            # pass the exception of the meter on, and keep it for max age
+            self.errors += 1
+            error = bytes((function | 0x80, response.exception_code))
+            now = time.monotonic()
+            for stale in [
+                stale
+                for stale, (refused_at, _) in self._refused.items()
+                if stale[0] == unit_id and now - refused_at >= max_age
+            ]:
+                del self._refused[stale]
+            self._refused[key] = (now, error)
+            return error
+        return struct.pack(f">BB{count}H", function, 2 * count, *response.registers)
+
+
+@callback
+def async_get_proxies(
+    hass: HomeAssistant,
+) -> dict[tuple[str, int], ModbusTcpProxy]:
+    """Return the running proxies by address and port, closing them on stop."""
+    if (proxies := hass.data.get(DATA_PROXIES)) is None:
+        proxies = hass.data[DATA_PROXIES] = {}
+
+        async def _async_shutdown(*_) -> None:
+            for proxy in list(proxies.values()):
+                await proxy.async_close()
+            proxies.clear()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+    return proxies
+
+
+async def async_acquire_proxy(
+    hass: HomeAssistant, host: str, port: int
+) -> ModbusTcpProxy:
+    """Return the proxy listening on host and port, starting it if needed."""
+    proxies = async_get_proxies(hass)
+    if (proxy := proxies.get((host, port))) is None:
+        proxy = ModbusTcpProxy(hass, host, port)
+        await proxy.async_start()
+        proxies[host, port] = proxy
+    proxy.users += 1
+    return proxy
+
+
+async def async_release_proxy(hass: HomeAssistant, proxy: ModbusTcpProxy) -> None:
+    """Release a proxy, closing it when it has no users left."""
+    proxy.users -= 1
+    proxies = async_get_proxies(hass)
+    if proxy.users <= 0 and proxies.get((proxy.host, proxy.port)) is proxy:
+        del proxies[proxy.host, proxy.port]
+        await proxy.async_close()
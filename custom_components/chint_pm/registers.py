@@ -0,0 +1,527 @@
+"""Register maps of the Chint pm meters."""
+
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable, Iterator, Mapping
+import struct
+from typing import Any
+
+# struct format characters of the register data types (big endian, ABCD)
+UINT16 = "H"
+FLOAT32 = "f"
+
+# registers per read holding registers request allowed by the protocol
+MAX_READ_COUNT = 125
+
+
+class RegisterBlock:
+    """A contiguous holding register range and the values decoded from it.
+
+    ``fields`` maps keys to the index of the value in the block, counted in
+    units of ``data_type`` (as pymodbus convert_from_registers would return
+    them). The layout is compiled into a single struct format with pad bytes
+    for the skipped registers, so decoding is one pack_into/unpack_from pair
+    on a preallocated buffer instead of a conversion list per block.
+    """
+
+    __slots__ = (
+        "address",
+        "count",
+        "keys",
+        "offsets",
+        "field",
+        "_buffer",
+        "_values",
+        "_words",
+    )
+
+    def __init__(
+        self,
+        address: int,
+        count: int,
+        data_type: str,
+        fields: tuple[tuple[str, int], ...],
+    ) -> None:
+        """Compile the block layout."""
+        self.address = address
+        self.count = count
+        size = struct.calcsize(data_type)
+        fmt = ">"
+        position = 0
+        keys = []
+        offsets = []
+        for key, index in sorted(fields, key=lambda field: field[1]):
+            if index * size > position:
+                fmt += f"{index * size - position}x"
+            fmt += data_type
+            position = (index + 1) * size
+            keys.append(key)
+            offsets.append(index * size // 2)
+        if position > 2 * count:
+            raise ValueError(f"fields exceed block {address:#06x}+{count}")
+
+        self.keys: tuple[str, ...] = tuple(keys)
+        # register offset of every key and the format of a single value, for
+        # ranges other than the whole block
+        self.offsets: tuple[int, ...] = tuple(offsets)
+        self.field = struct.Struct(f">{data_type}")
+        self._values = struct.Struct(fmt)
+        self._words = struct.Struct(f">{count}H")
+        # decode() never awaits, so one buffer per block is shared safely
+        self._buffer = bytearray(self._words.size)
+
+    def decode(self, registers: list[int]) -> tuple:
+        """Decode the values of ``keys`` from a read response."""
+        self._words.pack_into(self._buffer, 0, *registers)
+        return self._values.unpack_from(self._buffer)
+
+
+class RegisterMap:
+    """Register blocks of one meter type and the snapshot layout of its keys.
+
+    ``writable`` maps the keys of the configuration registers that can be
+    written (function code 0x10) to their register address.
+    """
+
+    __slots__ = ("blocks", "index", "slots", "writable")
+
+    def __init__(
+        self,
+        blocks: tuple[RegisterBlock, ...],
+        writable: dict[str, int] | None = None,
+    ) -> None:
+        """Assign every key a fixed position in the snapshot values."""
+        self.blocks = blocks
+        self.writable = writable or {}
+        self.index: dict[str, int] = {}
+        for block in blocks:
+            for key in block.keys:
+                self.index.setdefault(key, len(self.index))
+        # snapshot positions of the decoded values, per block
+        self.slots: tuple[tuple[int, ...], ...] = tuple(
+            tuple(self.index[key] for key in block.keys) for block in blocks
+        )
+
+    def plan(
+        self,
+        keys: Collection[str] | None = None,
+        max_gap: int | None = None,
+        breaks: Collection[int] = (),
+        max_count: int = MAX_READ_COUNT,
+    ) -> ReadPlan:
+        """Return the read plan of the blocks holding any of keys (all for None).
+
+        Neighbouring blocks are read with one request while the registers
+        between them are at most max_gap (no merging for None), the request
+        stays within max_count and the next block does not start at one of
+        breaks (where merging failed before). A block of more than max_count
+        registers is split over several requests of its own.
+        """
+        selected = [
+            position
+            for position, block in enumerate(self.blocks)
+            if keys is None or any(key in keys for key in block.keys)
+        ]
+        read = {slot for position in selected for slot in self.slots[position]}
+        blocks = tuple(self.blocks[position] for position in selected)
+
+        ranges: list[list[int]] = []
+        members: list[list[int]] = []
+        parts: list[tuple[tuple[int, int, int], ...]] = [()] * len(blocks)
+        # nothing is merged into the requests of a split block
+        mergeable = False
+        for position in sorted(range(len(blocks)), key=lambda i: blocks[i].address):
+            block = blocks[position]
+            start, end = block.address, block.address + block.count
+            if block.count > max_count:
+                chunks = []
+                for offset in range(0, block.count, max_count):
+                    count = min(max_count, block.count - offset)
+                    chunks.append((len(ranges), 0, count))
+                    ranges.append([start + offset, start + offset + count])
+                    members.append([position])
+                parts[position] = tuple(chunks)
+                mergeable = False
+                continue
+            if not (
+                max_gap is not None
+                and mergeable
+                and start - ranges[-1][1] <= max_gap
+                and start not in breaks
+                and max(end, ranges[-1][1]) - ranges[-1][0] <= max_count
+            ):
+                ranges.append([start, end])
+                members.append([])
+            ranges[-1][1] = max(end, ranges[-1][1])
+            members[-1].append(position)
+            parts[position] = ((len(ranges) - 1, start - ranges[-1][0], block.count),)
+            mergeable = True
+
+        return ReadPlan(
+            blocks,
+            tuple(self.slots[position] for position in selected),
+            tuple(
+                sorted(
+                    {slot for slots in self.slots for slot in slots}.difference(read)
+                )
+            ),
+            tuple((start, end - start) for start, end in ranges),
+            tuple(tuple(positions) for positions in members),
+            tuple(parts),
+        )
+
+    def decode_range(self, address: int, registers: list[int]) -> dict[int, Any]:
+        """Return the values within any register range by snapshot position.
+
+        For ranges this map did not plan, e.g. read by another master on the
+        bus; only values lying completely within the range are decoded.
+        """
+        end = address + len(registers)
+        words = struct.pack(f">{len(registers)}H", *registers)
+        values: dict[int, Any] = {}
+        for block, slots in zip(self.blocks, self.slots):
+            if block.address >= end or block.address + block.count <= address:
+                continue
+            width = block.field.size // 2
+            for slot, offset in zip(slots, block.offsets):
+                start = block.address + offset - address
+                if start >= 0 and start + width <= len(registers):
+                    values[slot] = block.field.unpack_from(words, 2 * start)[0]
+        return values
+
+    def values_from(self, values: Mapping[str, Any]) -> tuple:
+        """Return snapshot values from raw values by key, unknown keys ignored."""
+        positioned = [None] * len(self.index)
+        for key, value in values.items():
+            if (position := self.index.get(key)) is not None:
+                positioned[position] = value
+        return tuple(positioned)
+
+    def empty_snapshot(self) -> MeterSnapshot:
+        """Return a snapshot without any values."""
+        return MeterSnapshot(self.index, (None,) * len(self.index), 0, None)
+
+
+class ReadPlan:
+    """The register blocks read per cycle and the requests reading them.
+
+    ``unread`` holds the snapshot positions of the keys no block of the plan
+    provides; they are cleared instead of keeping a value that is no longer
+    refreshed. ``reads`` are the (address, count) requests, ``members`` the
+    positions of the blocks each request covers and ``parts`` the (read,
+    offset, count) slices every block is assembled from.
+    """
+
+    __slots__ = ("blocks", "slots", "unread", "reads", "members", "parts")
+
+    def __init__(
+        self,
+        blocks: tuple[RegisterBlock, ...],
+        slots: tuple[tuple[int, ...], ...],
+        unread: tuple[int, ...],
+        reads: tuple[tuple[int, int], ...],
+        members: tuple[tuple[int, ...], ...],
+        parts: tuple[tuple[tuple[int, int, int], ...], ...],
+    ) -> None:
+        """Initialize the plan."""
+        self.blocks = blocks
+        self.slots = slots
+        self.unread = unread
+        self.reads = reads
+        self.members = members
+        self.parts = parts
+
+
+class RegisterCache:
+    """The raw holding register values last read from a meter.
+
+    Every register keeps the monotonic time it was read at, so a range is
+    only served while all of its registers are fresh.
+    """
+
+    __slots__ = ("_values", "_times")
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._values: dict[int, int] = {}
+        self._times: dict[int, float] = {}
+
+    def update(self, address: int, registers: list[int], now: float) -> None:
+        """Store the registers of a read response."""
+        for offset, value in enumerate(registers):
+            self._values[address + offset] = value
+            self._times[address + offset] = now
+
+    def get(
+        self, address: int, count: int, max_age: float, now: float
+    ) -> list[int] | None:
+        """Return count registers from address, None unless all are fresh."""
+        times = self._times
+        oldest = now - max_age
+        for register in range(address, address + count):
+            if times.get(register, oldest - 1) < oldest:
+                return None
+        return [self._values[register] for register in range(address, address + count)]
+
+
+class ScalingTable:
+    """Scale, offset and precision per snapshot position.
+
+    Applied once to a whole snapshot; positions without an entry are passed
+    through unchanged.
+    """
+
+    __slots__ = ("_rounded", "_scaled")
+
+    def __init__(self, entries: Iterable[tuple[int, float, float, int | None]]) -> None:
+        """Split the entries by whether they round."""
+        entries = tuple(entries)
+        self._rounded = tuple(entry for entry in entries if entry[3] is not None)
+        self._scaled = tuple(
+            (slot, scale, offset)
+            for slot, scale, offset, precision in entries
+            if precision is None and (scale, offset) != (1.0, 0.0)
+        )
+
+    def apply(self, values: tuple) -> tuple:
+        """Return the scaled values."""
+        scaled = list(values)
+        for slot, scale, offset, precision in self._rounded:
+            if (value := values[slot]) is not None:
+                scaled[slot] = round(value * scale + offset, precision)
+        for slot, scale, offset in self._scaled:
+            if (value := values[slot]) is not None:
+                scaled[slot] = value * scale + offset
+        return tuple(scaled)
+
+
+class MeterSnapshot(Mapping):
+    """Immutable values of one complete read cycle.
+
+    Values live in a tuple laid out by the register map; keys that were not
+    read (yet) hold None and are not part of the mapping. The mapping holds
+    the raw register values, ``scaled`` the same positions in the native
+    units of the entities. ``failed`` holds the positions of blocks that
+    could not be read in this cycle; they carry the previous values.
+    """
+
+    __slots__ = ("_index", "values", "scaled", "failed", "seq", "timestamp")
+
+    def __init__(
+        self,
+        index: dict[str, int],
+        values: tuple,
+        seq: int,
+        timestamp: float | None,
+        scaled: tuple | None = None,
+        failed: frozenset[int] = frozenset(),
+    ) -> None:
+        """Initialize the snapshot."""
+        self._index = index
+        self.values = values
+        self.scaled = values if scaled is None else scaled
+        self.failed = failed
+        self.seq = seq
+        self.timestamp = timestamp
+
+    def __getitem__(self, key: str):
+        """Return the value of key."""
+        value = self.values[self._index[key]]
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys holding a value."""
+        values = self.values
+        return (
+            key for key, position in self._index.items() if values[position] is not None
+        )
+
+    def __len__(self) -> int:
+        """Return the number of keys holding a value."""
+        return sum(value is not None for value in self.values)
+
+
+# DTSU666-H (Huawei)
+H_3P_BLOCKS: tuple[RegisterBlock, ...] = (
+    RegisterBlock(
+        0x0,
+        12,
+        UINT16,
+        (
+            # REV verison
+            ("rev", 0),
+            # UCode Programming password codE
+            ("ucode", 1),
+            # ClrE Electric energy zero clearing CLr.E(1:zero clearing)
+            ("clre", 2),
+            # net Selecting of the connection mode net(0:3P4W,1:3P3W)
+            ("net", 3),
+            # IrAt Current Transformer Ratio
+            ("irat", 6),
+            # UrAt Potential Transformer Ratio(*)
+            ("urat", 7),
+            # Meter type
+            ("meter_type", 11),
+        ),
+    ),
+    RegisterBlock(
+        0x2C,
+        9,
+        UINT16,
+        (
+            # Protocol Protocol changing-over
+            ("protocol", 0),
+            # Addr Communication address Addr
+            ("addr", 1),
+            # bAud Communication baud rate bAud
+            ("baud", 2),
+            ("secound", 3),
+            ("minutes", 4),
+            ("hour", 5),
+            ("day", 6),
+            ("month", 7),
+            ("year", 8),
+        ),
+    ),
+    RegisterBlock(
+        0x2000,
+        0x22,
+        FLOAT32,
+        (
+            # Line -line voltage, the unit is V
+            ("uab", 0),
+            ("ubc", 1),
+            ("uca", 2),
+            # Phase-phase voltage, the unit is V
+            ("ua", 3),
+            ("ub", 4),
+            ("uc", 5),
+            # The data of three phase current,the unit is A
+            ("ia", 6),
+            ("ib", 7),
+            ("ic", 8),
+            # Active power，the unit is W (Pb invalid when three phase three wire)
+            ("pt", 9),
+            ("pa", 10),
+            ("pb", 11),
+            ("pc", 12),
+            # Reactive power，the unit is var (Qb invalid when three phase three wire)
+            ("qt", 13),
+            ("qa", 14),
+            ("qb", 15),
+            ("qc", 16),
+        ),
+    ),
+    RegisterBlock(
+        0x202A,
+        8,
+        FLOAT32,
+        (
+            # Power factor (phases invalid when three phase three wire)
+            ("pft", 0),
+            ("pfa", 1),
+            ("pfb", 2),
+            ("pfc", 3),
+        ),
+    ),
+    RegisterBlock(
+        0x2044,
+        8,
+        FLOAT32,
+        (
+            # Freq Frequency
+            ("freq", 0),
+            # DmPt Total active power demand
+            ("dmpt", 3),
+        ),
+    ),
+    # documentation say address is 0x401e but this register contain invalid data, maybe only -H version?
+    RegisterBlock(
+        0x4026,
+        12,
+        FLOAT32,
+        (
+            # ImpEp (current)positive active total energy
+            ("impep", 0),
+            # ExpEp (current)negative active total energy
+            ("expep", 5),
+        ),
+    ),
+    # (current) quadrant I-IV reactive total energy
+    RegisterBlock(0x4032, 2, FLOAT32, (("q1eq", 0),)),
+    RegisterBlock(0x403C, 2, FLOAT32, (("q2eq", 0),)),
+    RegisterBlock(0x4046, 2, FLOAT32, (("q3eq", 0),)),
+    RegisterBlock(0x4050, 2, FLOAT32, (("q4eq", 0),)),
+)
+
+# DTSU666 (Normal), values are scaled by the sensor descriptions
+CT_3P_BLOCKS: tuple[RegisterBlock, ...] = (
+    RegisterBlock(
+        0x0,
+        12,
+        UINT16,
+        (
+            ("rev", 0),
+            ("ucode", 1),
+            ("clre", 2),
+            ("net", 3),
+            ("irat", 6),
+            ("urat", 7),
+        ),
+    ),
+    RegisterBlock(
+        0x2C,
+        9,
+        UINT16,
+        (
+            ("protocol", 0),
+            # this map has bAud before Addr
+            ("baud", 1),
+            ("addr", 2),
+        ),
+    ),
+    H_3P_BLOCKS[2],
+    H_3P_BLOCKS[3],
+    RegisterBlock(0x2044, 8, FLOAT32, (("freq", 0),)),
+    RegisterBlock(
+        0x101E,
+        12,
+        FLOAT32,
+        (
+            ("impep", 0),
+            ("expep", 5),
+        ),
+    ),
+    RegisterBlock(0x1032, 2, FLOAT32, (("q1eq", 0),)),
+    RegisterBlock(0x103C, 2, FLOAT32, (("q2eq", 0),)),
+    RegisterBlock(0x1046, 2, FLOAT32, (("q3eq", 0),)),
+    RegisterBlock(0x1050, 2, FLOAT32, (("q4eq", 0),)),
+)
+
+H_3P_WRITABLE: dict[str, int] = {
+    "clre": 0x2,
+    "irat": 0x6,
+    "urat": 0x7,
+    "addr": 0x2D,
+    "baud": 0x2E,
+    "secound": 0x2F,
+    "minutes": 0x30,
+    "hour": 0x31,
+    "day": 0x32,
+    "month": 0x33,
+    "year": 0x34,
+}
+
+# the DTSU666 has no clock registers
+CT_3P_WRITABLE: dict[str, int] = {
+    "clre": 0x2,
+    "irat": 0x6,
+    "urat": 0x7,
+    "baud": 0x2D,
+    "addr": 0x2E,
+}
+
+H_3P_MAP = RegisterMap(H_3P_BLOCKS, H_3P_WRITABLE)
+CT_3P_MAP = RegisterMap(CT_3P_BLOCKS, CT_3P_WRITABLE)
@@ -0,0 +1,132 @@
+"""Replay client for captured Chint pm register streams."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from pymodbus.client.mixin import ModbusClientMixin
+from pymodbus.exceptions import ModbusIOException
+
+from .capture import CaptureRecord, read_capture_file
+
+
+@dataclass
+class ReplayResponse:
+    """Minimal read_holding_registers response."""
+
+    registers: list[int]
+    dev_id: int = 0
+
+    def isError(self) -> bool:  # noqa: N802 - pymodbus naming
+        """A replayed response is never a modbus error."""
+        return False
+
+
+class ReplayModbusClient:
+    """Modbus client that answers reads from captured register responses.
+
+    It implements the part of the pymodbus async client surface used by
+    ChintDxsuDevice, so it can be handed to
+    ``ChintUpdateCoordinator.create_client`` to run the decode and entity path
+    without hardware. The records of every unit id are applied in capture
+    order to a register image and reads are answered from it, so any range
+    within the captured registers can be read, whatever the read plan was
+    when it was captured. A read of registers already served applies the
+    following records until all of its captured registers were refreshed;
+    registers between captured ranges read as 0. With ``realtime`` the
+    recorded gaps between applied records are kept, otherwise reads are
+    answered as fast as possible.
+    """
+
+    DATATYPE = ModbusClientMixin.DATATYPE
+    convert_from_registers = ModbusClientMixin.convert_from_registers
+
+    def __init__(
+        self,
+        records: Iterable[CaptureRecord],
+        realtime: bool = False,
+        loop: bool = True,
+    ) -> None:
+        """Initialize the replay client."""
+        self._realtime = realtime
+        self._loop = loop
+        self._streams: dict[int, list[CaptureRecord]] = {}
+        self._positions: dict[int, int] = {}
+        # register values applied so far and those not served since
+        self._images: dict[int, dict[int, int]] = {}
+        self._unserved: dict[int, set[int]] = {}
+        # every register address captured per unit
+        self._captured: dict[int, set[int]] = {}
+        self._last_timestamp: float | None = None
+        self._connected = False
+        for record in records:
+            self._streams.setdefault(record.unit_id, []).append(record)
+            self._captured.setdefault(record.unit_id, set()).update(
+                range(record.address, record.address + len(record.registers))
+            )
+
+    @classmethod
+    def from_capture_file(cls, path: str, **kwargs) -> ReplayModbusClient:
+        """Create a replay client from a capture file (blocking I/O)."""
+        return cls(read_capture_file(path), **kwargs)
+
+    @property
+    def connected(self) -> bool:
+        """Return True once connect was called."""
+        return self._connected
+
+    async def connect(self) -> bool:
+        """Pretend to connect."""
+        self._connected = True
+        return True
+
+    def close(self) -> None:
+        """Pretend to disconnect."""
+        self._connected = False
+
+    async def read_holding_registers(
+        self,
+        address: int,
+        *,
+        count: int = 1,
+        device_id: int = 1,
+        no_response_expected: bool = False,
+    ) -> ReplayResponse:
+        """Return the registers of the next captured values for this range."""
+        requested = range(address, address + count)
+        needed = self._captured.get(device_id, set()).intersection(requested)
+        if not needed:
+            raise ModbusIOException(
+                f"no captured response for unit {device_id}"
+                f" address {address:#06x}+{count}"
+            )
+        image = self._images.setdefault(device_id, {})
+        unserved = self._unserved.setdefault(device_id, set())
+        stream = self._streams[device_id]
+        position = self._positions.get(device_id, 0)
+        last = None
+        while not needed <= unserved:
+            if position >= len(stream):
+                if not self._loop:
+                    raise ModbusIOException(
+                        f"capture of unit {device_id} exhausted at {address:#06x}"
+                    )
+                position = 0
+            last = stream[position]
+            position += 1
+            for offset, value in enumerate(last.registers):
+                image[last.address + offset] = value
+                unserved.add(last.address + offset)
+        self._positions[device_id] = position
+        unserved.difference_update(needed)
+
+        if self._realtime and last is not None:
+            if self._last_timestamp is not None:
+                await asyncio.sleep(max(0.0, last.timestamp - self._last_timestamp))
+            self._last_timestamp = last.timestamp
+
+        return ReplayResponse(
+            [image.get(register, 0) for register in requested], device_id
+        )
@@ -2,818 +2,166 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
-from itertools import zip_longest
 from typing import Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import (
-    UnitOfElectricCurrent,
-    UnitOfElectricPotential,
-    UnitOfEnergy,
-    UnitOfFrequency,
-    UnitOfPower,
-    UnitOfReactivePower,
-)
+from homeassistant.const import PERCENTAGE, UnitOfPower, UnitOfTime
 from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from . import ChintDxsuDevice, ChintUpdateCoordinator
-from .const import (
-    CONF_METER_TYPE,
-    CONF_PHASE_MODE,
-    DATA_UPDATE_COORDINATORS,
-    DOMAIN,
-    PHMODE_3P3W,
-    PHMODE_3P4W,
-    MeterTypes,
-)
+from .const import DATA_UPDATE_COORDINATORS, DEMAND_WINDOWS, DOMAIN
+from .coordinator import ChintUpdateCoordinator
+from .profiles import ChintPmSensorEntityDescription
+from .stats import LinkStats
 
 
 @dataclass
-class ChintPmSensorEntityDescription(SensorEntityDescription):
-    """Chint PM Sensor Entity."""
+class ChintPmDemandSensorEntityDescription(SensorEntityDescription):
+    """Chint PM demand sensor entity."""
 
-    phase_mode_relevant: str | None = None
-    address: int | None = None
-    count: int | None = None
-    data_type: str | None = None
-    value_conversion_function: Callable[[Any], str] | None = None
+    window: int = 900
+    peak: bool = False
 
 
-SENSOR_DESCRIPTIONS: tuple[ChintPmSensorEntityDescription, ...] = (
-    ChintPmSensorEntityDescription(
-        key="rev",
-        name="Version",
-        icon="mdi:package-variant",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="ucode",
-        name="Programming password codE",
-        icon="mdi:form-textbox-password",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="clre",
-        name="Electric energy zero clearing CLr.E(1:zero clearing)",
-        icon="mdi:tune-vertical-variant",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="net",
-        name="Connection mode net",
-        icon="mdi:tune-vertical-variant",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="irat",
-        name="Current Transformer Ratio",
-        icon="mdi:information-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="urat",
-        name="Potential Transformer Ratio(*)",
-        icon="mdi:information-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: value * 0.1,
-    ),
-    ChintPmSensorEntityDescription(
-        key="meter_type",
-        name="Meter type",
-        icon="mdi:format-list-bulleted-type",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="protocol",
-        name="Protocol changing-over",
-        icon="mdi:electric-switch-closed",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="addr",
-        name="Communication address Addr",
-        icon="mdi:map-marker-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="baud",
-        name="Communication baud rate bAud",
-        icon="mdi:speedometer",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="secound",
-        name="Second",
-        icon="mdi:clock-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="minutes",
-        name="Minute",
-        icon="mdi:clock-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="hour",
-        name="Hour",
-        icon="mdi:clock-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="day",
-        name="Day",
-        icon="mdi:calendar-month-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="month",
-        name="Month",
-        icon="mdi:calendar-month-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="year",
-        name="Year",
-        icon="mdi:calendar-month-outline",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    # electricity measurements
-    ChintPmSensorEntityDescription(
-        key="uab",
-        name="Line AB-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ubc",
-        name="Line BC-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="uca",
-        name="Line CA-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ua",
-        name="A-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ub",
-        name="B-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="uc",
-        name="C-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ia",
-        name="A phase current",
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ib",
-        name="B phase current",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ic",
-        name="C phase current",
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pt",
-        name="Conjunction active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pa",
-        name="A phase active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pb",
-        name="B phase active power",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pc",
-        name="C phase active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qt",
-        name="Conjunction reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qa",
-        name="A phase reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qb",
-        name="B phase reactive power",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qc",
-        name="C phase reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pft",
-        name="Conjunction power factor",
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfa",
-        name="A phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfb",
-        name="B phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfc",
-        name="C phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="freq",
-        name="Frequency",
-        icon="mdi:wave",
-        native_unit_of_measurement=UnitOfFrequency.HERTZ,
-        device_class=SensorDeviceClass.FREQUENCY,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="dmpt",
-        name="Total active power demand",
-        icon="mdi:home-lightning-bolt-outline",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="impep",
-        name="Positive active total energy",
-        icon="mdi:transmission-tower-export",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="expep",
-        name="Negative active total energy",
-        icon="mdi:transmission-tower-import",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q1eq",
-        name="Quadrant I reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q2eq",
-        name="Quadrant II reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q3eq",
-        name="Quadrant III reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q4eq",
-        name="Quadrant IV reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
+# computed from pt by the coordinator, for every meter type
+DEMAND_SENSOR_DESCRIPTIONS: tuple[ChintPmDemandSensorEntityDescription, ...] = (
+    *(
+        ChintPmDemandSensorEntityDescription(
+            key=f"demand_{window // 60}m",
+            name=f"Active power demand {window // 60} min",
+            icon="mdi:home-lightning-bolt-outline",
+            native_unit_of_measurement=UnitOfPower.WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_registry_enabled_default=window == DEMAND_WINDOWS[0],
+            window=window,
+        )
+        for window in DEMAND_WINDOWS
+    ),
+    *(
+        ChintPmDemandSensorEntityDescription(
+            key=f"peak_demand_{window // 60}m",
+            name=f"Peak active power demand {window // 60} min",
+            icon="mdi:chart-bell-curve-cumulative",
+            native_unit_of_measurement=UnitOfPower.WATT,
+            device_class=SensorDeviceClass.POWER,
+            entity_registry_enabled_default=window == DEMAND_WINDOWS[0],
+            window=window,
+            peak=True,
+        )
+        for window in DEMAND_WINDOWS
     ),
 )
 
-SENSOR_DESCRIPTIONS_TYPE_NORMAL: tuple[ChintPmSensorEntityDescription, ...] = (
-    ChintPmSensorEntityDescription(
-        key="rev",
-        name="Version",
-        icon="mdi:package-variant",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="ucode",
-        name="Programming password codE",
-        icon="mdi:form-textbox-password",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="clre",
-        name="Electric energy zero clearing CLr.E(1:zero clearing)",
-        icon="mdi:tune-vertical-variant",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-    ),
-    ChintPmSensorEntityDescription(
-        key="net",
-        name="Connection mode net",
-        icon="mdi:tune-vertical-variant",
+
+@dataclass
+class ChintPmLinkSensorEntityDescription(SensorEntityDescription):
+    """Chint PM link quality sensor entity."""
+
+    value_fn: Callable[[LinkStats], Any] = lambda stats: None
+    bus: bool = False
+    attributes_fn: Callable[[LinkStats], dict[str, Any]] | None = None
+
+
+def _percent(value: float | None) -> float | None:
+    return round(value * 100, 2) if value is not None else None
+
+
+def _milliseconds(value: float | None) -> float | None:
+    return round(value * 1000, 1) if value is not None else None
+
+
+# counted by the bus client, of the slave or of the whole transport
+LINK_SENSOR_DESCRIPTIONS: tuple[ChintPmLinkSensorEntityDescription, ...] = (
+    ChintPmLinkSensorEntityDescription(
+        key="link_success_rate",
+        name="Link success rate",
+        icon="mdi:lan-check",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _percent(stats.success_rate),
+        attributes_fn=LinkStats.as_dict,
     ),
-    ChintPmSensorEntityDescription(
-        key="irat",
-        name="Current Transformer Ratio",
-        icon="mdi:information-outline",
+    ChintPmLinkSensorEntityDescription(
+        key="link_rtt_mean",
+        name="Link round trip time",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        value_fn=lambda stats: _milliseconds(stats.rtt_mean),
     ),
-    ChintPmSensorEntityDescription(
-        key="urat",
-        name="Potential Transformer Ratio(*)",
-        icon="mdi:information-outline",
+    ChintPmLinkSensorEntityDescription(
+        key="link_rtt_p95",
+        name="Link round trip time p95",
+        icon="mdi:timer-alert-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: value * 0.1,
+        value_fn=lambda stats: _milliseconds(stats.rtt_p95),
     ),
-    ChintPmSensorEntityDescription(
-        key="protocol",
-        name="Protocol changing-over",
-        icon="mdi:electric-switch-closed",
+    ChintPmLinkSensorEntityDescription(
+        key="link_timeouts",
+        name="Link timeouts",
+        icon="mdi:timer-off-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.timeouts,
     ),
-    ChintPmSensorEntityDescription(
-        key="addr",
-        name="Communication address Addr",
-        icon="mdi:map-marker-outline",
+    ChintPmLinkSensorEntityDescription(
+        key="link_framing_errors",
+        name="Link framing errors",
+        icon="mdi:alert-box-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.framing_errors,
     ),
-    ChintPmSensorEntityDescription(
-        key="baud",
-        name="Communication baud rate bAud",
-        icon="mdi:speedometer",
+    ChintPmLinkSensorEntityDescription(
+        key="link_exceptions",
+        name="Link exception responses",
+        icon="mdi:alert-octagon-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        value_fn=lambda stats: sum(stats.exception_codes.values()),
+        attributes_fn=lambda stats: {"exception_codes": dict(stats.exception_codes)},
     ),
-    # electricity measurements
-    ChintPmSensorEntityDescription(
-        key="uab",
-        name="Line AB-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ubc",
-        name="Line BC-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="uca",
-        name="Line CA-line voltage",
-        phase_mode_relevant=PHMODE_3P3W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ua",
-        name="A-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ub",
-        name="B-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="uc",
-        name="C-phase voltage",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:sine-wave",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ia",
-        name="A phase current",
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ib",
-        name="B phase current",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="ic",
-        name="C phase current",
-        icon="mdi:current-ac",
-        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pt",
-        name="Conjunction active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pa",
-        name="A phase active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pb",
-        name="B phase active power",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pc",
-        name="C phase active power",
-        icon="mdi:flash",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qt",
-        name="Conjunction reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qa",
-        name="A phase reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qb",
-        name="B phase reactive power",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="qc",
-        name="C phase reactive power",
-        icon="mdi:lightning-bolt-circle",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.REACTIVE_POWER,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.1, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pft",
-        name="Conjunction power factor",
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfa",
-        name="A phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfb",
-        name="B phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
+    ChintPmLinkSensorEntityDescription(
+        key="bus_success_rate",
+        name="Bus success rate",
+        icon="mdi:transit-connection-variant",
+        native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="pfc",
-        name="C phase power factor",
-        phase_mode_relevant=PHMODE_3P4W,
-        icon="mdi:math-cos",
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value * 0.001, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="freq",
-        name="Frequency",
-        icon="mdi:wave",
-        native_unit_of_measurement=UnitOfFrequency.HERTZ,
-        device_class=SensorDeviceClass.FREQUENCY,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value * 0.01, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="impep",
-        name="Positive active total energy",
-        icon="mdi:transmission-tower-export",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="expep",
-        name="Negative active total energy",
-        icon="mdi:transmission-tower-import",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=True,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q1eq",
-        name="Quadrant I reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q2eq",
-        name="Quadrant II reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
-    ),
-    ChintPmSensorEntityDescription(
-        key="q3eq",
-        name="Quadrant III reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
+        bus=True,
+        value_fn=lambda stats: _percent(stats.success_rate),
+        attributes_fn=LinkStats.as_dict,
     ),
-    ChintPmSensorEntityDescription(
-        key="q4eq",
-        name="Quadrant IV reactive total energy",
-        icon="mdi:",
-        native_unit_of_measurement="kVarh",
-        device_class=None,
+    ChintPmLinkSensorEntityDescription(
+        key="bus_reconnects",
+        name="Bus reconnects",
+        icon="mdi:connection",
         state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
-        value_conversion_function=lambda value: round(value, 2),
+        bus=True,
+        value_fn=lambda stats: stats.reconnects,
     ),
 )
 
@@ -825,60 +173,187 @@ async def async_setup_entry(hass, entry, async_add_entities):
         entry.entry_id
     ][DATA_UPDATE_COORDINATORS]
 
-    entities_to_add: list[SensorEntity] = []
-    for idx, (update_coordinator) in enumerate(zip_longest(update_coordinators)):
-        # device = update_coordinators[idx].device
-        device_info = update_coordinator[idx].device_info
+    entities_to_add: list[SensorEntity] = [
+        ChintPMModbusSensor(update_coordinator, entity_description, slot)
+        for update_coordinator in update_coordinators
+        for entity_description, slot in zip(
+            update_coordinator.device.profile.descriptions,
+            update_coordinator.device.profile.slots,
+        )
+    ]
+    entities_to_add.extend(
+        ChintPMDemandSensor(update_coordinator, entity_description)
+        for update_coordinator in update_coordinators
+        for entity_description in DEMAND_SENSOR_DESCRIPTIONS
+    )
+    entities_to_add.extend(
+        ChintPMLinkSensor(update_coordinator, entity_description)
+        for update_coordinator in update_coordinators
+        for entity_description in LINK_SENSOR_DESCRIPTIONS
+    )
+
+    # polling is up to the scheduler, an update before add would read every
+    # meter at once
+    async_add_entities(entities_to_add)
+
+
+class ChintPMModbusSensor(CoordinatorEntity, RestoreSensor):
+    """power meter sensor
+
+    Only holds what differs per entity; the description, device info and
+    snapshot layout are shared with every other sensor of the same meter.
+    Until the first cycle is read it shows the value of the restored
+    snapshot, or else its own restored state.
+    """
+
+    def __init__(
+        self,
+        coordinator: ChintUpdateCoordinator,
+        description: ChintPmSensorEntityDescription,
+        slot: int | None,
+    ):
+        """Chint pm sensor entity constructor."""
+        super().__init__(coordinator)
+
+        self.entity_description = description
+        self._attr_device_info = coordinator.device_info
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
+        # position of this key in the coordinator snapshots
+        self._slot = slot
+
+    @property
+    def available(self) -> bool:
+        """Return False without a value or if the block of this sensor failed."""
+        return (
+            super().available
+            and self._attr_native_value is not None
+            and self._slot not in self.coordinator.device.data.failed
+        )
 
-        match entry.data[CONF_METER_TYPE]:
-            case MeterTypes.METER_TYPE_CT_3P:
-                used_sensor_description = SENSOR_DESCRIPTIONS_TYPE_NORMAL
-            case _:
-                used_sensor_description = SENSOR_DESCRIPTIONS
+    async def async_added_to_hass(self) -> None:
+        """Restore the value and have the coordinator read its register block."""
+        await super().async_added_to_hass()
+        if self._slot is None:
+            return
+        self.async_on_remove(
+            self.coordinator.async_register_keys((self.entity_description.key,))
+        )
+        if not self._update_value() and (
+            last := await self.async_get_last_sensor_data()
+        ):
+            self._attr_native_value = last.native_value
 
-        for entity_description in used_sensor_description:
-            if entity_description.phase_mode_relevant == entry.data[CONF_PHASE_MODE]:
-                entity_description.entity_registry_enabled_default = True
+    def _update_value(self) -> bool:
+        # already scaled by the coordinator
+        value = self.coordinator.device.data.scaled[self._slot]
+        if value is None:
+            return False
+        self._attr_native_value = value
+        return True
 
-            sensor = ChintPMModbusSensor(
-                update_coordinator[idx], entity_description, device_info
-            )
-            # TODO: itt kell hozzá adnom a modbus cimeket
-            # await update_coordinator[idx].push_sensor_read(
-            #   entity_description.address,
-            #   entity_description.count,
-            #   entity_description.data_type,
-            # )
-            entities_to_add.append(sensor)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self._slot is not None:
+            # also when the value is unchanged, its block may have failed
+            self._update_value()
+            self.async_write_ha_state()
 
-    async_add_entities(entities_to_add, True)
 
+class ChintPMDemandSensor(CoordinatorEntity, SensorEntity):
+    """rolling or billing period peak demand sensor"""
 
-class ChintPMModbusSensor(CoordinatorEntity, ChintDxsuDevice, SensorEntity):
-    """power meter sensor"""
+    entity_description: ChintPmDemandSensorEntityDescription
 
     def __init__(
         self,
         coordinator: ChintUpdateCoordinator,
-        description: ChintPmSensorEntityDescription,
-        device_info,
+        description: ChintPmDemandSensorEntityDescription,
     ):
-        """Batched Huawei Solar Sensor Entity constructor."""
+        """Chint pm demand sensor entity constructor."""
         super().__init__(coordinator)
 
-        self.coordinator = coordinator
         self.entity_description = description
+        self._attr_device_info = coordinator.device_info
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
+
+    @property
+    def available(self) -> bool:
+        """Return False until a cycle of the meter was read or restored."""
+        return super().available and self.coordinator.device.data.timestamp is not None
+
+    async def async_added_to_hass(self) -> None:
+        """Show the restored demand right away."""
+        await super().async_added_to_hass()
+        self._update_value()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_value()
+        self.async_write_ha_state()
 
-        self._attr_device_info = device_info
+    def _update_value(self) -> None:
+        demand = self.coordinator.demand
+        window = self.entity_description.window
+        if self.entity_description.peak:
+            peak = demand.peak(window)
+            value = peak[0] if peak else None
+            self._attr_extra_state_attributes = {
+                "period": demand.period,
+                "time": (
+                    dt_util.utc_from_timestamp(peak[1]).isoformat() if peak else None
+                ),
+            }
+        else:
+            value = demand.demand(window)
+        self._attr_native_value = round(value, 2) if value is not None else None
+
+
+class ChintPMLinkSensor(CoordinatorEntity, SensorEntity):
+    """link quality sensor
+
+    Stays available while the meter does not answer, that is when the
+    counters matter most.
+    """
+
+    entity_description: ChintPmLinkSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: ChintUpdateCoordinator,
+        description: ChintPmLinkSensorEntityDescription,
+    ):
+        """Chint pm link sensor entity constructor."""
+        super().__init__(coordinator)
+
+        self.entity_description = description
+        self._attr_device_info = coordinator.device_info
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
 
+    @property
+    def available(self) -> bool:
+        """Return True, failed polls are counted rather than hidden."""
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        """Show the counters right away."""
+        await super().async_added_to_hass()
+        self._update_value()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if self.entity_description.key in self.coordinator.device.data:
-            value = self.coordinator.device.data[self.entity_description.key]
-            if self.entity_description.value_conversion_function:
-                value = self.entity_description.value_conversion_function(value)
+        self._update_value()
+        self.async_write_ha_state()
 
-            self._attr_native_value = value
-            self.async_write_ha_state()
+    def _update_value(self) -> None:
+        description = self.entity_description
+        stats = (
+            self.coordinator.bus_stats
+            if description.bus
+            else self.coordinator.link_stats
+        )
+        self._attr_native_value = description.value_fn(stats)
+        if description.attributes_fn is not None:
+            self._attr_extra_state_attributes = description.attributes_fn(stats)
@@ -0,0 +1,233 @@
+"""Services of the Chint pm integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_extract_config_entry_ids
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_SLAVE_IDS, DATA_UPDATE_COORDINATORS, DOMAIN, SERIAL_BAUDRATE
+
+SERVICE_WRITE_CONFIGURATION = "write_configuration"
+
+ATTR_CURRENT_RATIO = "current_ratio"
+ATTR_VOLTAGE_RATIO = "voltage_ratio"
+ATTR_ADDRESS = "address"
+ATTR_BAUD_RATE = "baud_rate"
+ATTR_CLEAR_ENERGY = "clear_energy"
+ATTR_SYNC_CLOCK = "sync_clock"
+
+# bAud register codes
+BAUD_RATE_CODES = {1200: 0, 2400: 1, 4800: 2, 9600: 3, 19200: 4}
+
+_WRITE_ATTRIBUTES = (
+    ATTR_CURRENT_RATIO,
+    ATTR_VOLTAGE_RATIO,
+    ATTR_ADDRESS,
+    ATTR_BAUD_RATE,
+    ATTR_CLEAR_ENERGY,
+    ATTR_SYNC_CLOCK,
+)
+
+# ClrE is a command and a new baud rate only applies to the next frame, so
+# neither can be read back
+_UNVERIFIED_KEYS = frozenset({"clre", "baud"})
+
+
+def _has_values(data: dict[str, Any]) -> dict[str, Any]:
+    """Reject a call that writes nothing, e.g. with only clear_energy false."""
+    if not any(data.get(key) not in (None, False) for key in _WRITE_ATTRIBUTES):
+        raise vol.Invalid("nothing to write")
+    return data
+
+
+WRITE_CONFIGURATION_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Optional(ATTR_CURRENT_RATIO): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=9999)
+            ),
+            vol.Optional(ATTR_VOLTAGE_RATIO): vol.All(
+                vol.Coerce(float), vol.Range(min=0.1, max=999.9)
+            ),
+            vol.Optional(ATTR_ADDRESS): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=247)
+            ),
+            # the buses talk to the meters at a fixed rate, a meter set to
+            # another one would no longer be reachable
+            vol.Optional(ATTR_BAUD_RATE): vol.All(
+                vol.Coerce(int), vol.In((SERIAL_BAUDRATE,))
+            ),
+            vol.Optional(ATTR_CLEAR_ENERGY): cv.boolean,
+            vol.Optional(ATTR_SYNC_CLOCK): cv.boolean,
+        }
+    ),
+    _has_values,
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the chint_pm services."""
+
+    async def async_write_configuration(call: ServiceCall) -> ServiceResponse:
+        return await _async_write_configuration(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_WRITE_CONFIGURATION,
+        async_write_configuration,
+        schema=WRITE_CONFIGURATION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _values(coordinator, data: dict[str, Any]) -> dict[str, int]:
+    """Return the raw register values to write, by key."""
+    values: dict[str, int] = {}
+    if ATTR_CURRENT_RATIO in data:
+        values["irat"] = data[ATTR_CURRENT_RATIO]
+    if ATTR_VOLTAGE_RATIO in data:
+        # UrAt is stored in 0.1 steps
+        values["urat"] = round(data[ATTR_VOLTAGE_RATIO] * 10)
+    if ATTR_ADDRESS in data:
+        values["addr"] = data[ATTR_ADDRESS]
+    if ATTR_BAUD_RATE in data:
+        values["baud"] = BAUD_RATE_CODES[data[ATTR_BAUD_RATE]]
+    if data.get(ATTR_CLEAR_ENERGY):
+        values["clre"] = 1
+    if data.get(ATTR_SYNC_CLOCK):
+        now = dt_util.now()
+        year = coordinator.device.data.get("year")
+        values.update(
+            secound=now.second,
+            minutes=now.minute,
+            hour=now.hour,
+            day=now.day,
+            month=now.month,
+            # keep the year format the meter reports
+            year=now.year if year is not None and year > 99 else now.year % 100,
+        )
+    return values
+
+
+async def _async_write_meter(coordinator, data: dict[str, Any]) -> dict[str, Any]:
+    """Write and verify one meter and return its report."""
+    entry = coordinator.config_entry
+    report: dict[str, Any] = {
+        "title": entry.title,
+        "slave": entry.data[CONF_SLAVE_IDS][0],
+        "success": False,
+    }
+    values = _values(coordinator, data)
+    writable = coordinator.device.register_map.writable
+    if unsupported := sorted(key for key in values if key not in writable):
+        report["error"] = f"not supported by this meter: {', '.join(unsupported)}"
+        return report
+
+    registers = {writable[key]: value for key, value in values.items()}
+    verify = {writable[key]: key for key in values if key not in _UNVERIFIED_KEYS}
+    try:
+        read_back = await coordinator.async_write_registers(
+            registers, verify, values.get("addr")
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        report["error"] = str(err) or type(err).__name__
+        return report
+
+    report["written"] = values
+    report["unverified"] = sorted(key for key in values if key in _UNVERIFIED_KEYS)
+    mismatch = {
+        key: {"expected": registers[address], "read": read_back.get(address)}
+        for address, key in verify.items()
+        # the clock keeps running while it is read back
+        if key != "secound" and read_back.get(address) != registers[address]
+    }
+    if mismatch:
+        report["mismatch"] = mismatch
+        report["error"] = "read back does not match"
+        return report
+
+    report["success"] = True
+    if "addr" in values and values["addr"] != report["slave"]:
+        # the meter only answers on its new address from now on
+        coordinator.hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_SLAVE_IDS: [values["addr"]]}
+        )
+    return report
+
+
+async def _async_write_transport(coordinators, data: dict[str, Any]) -> list[dict]:
+    """Write the meters of one transport, one after another."""
+    return [await _async_write_meter(coordinator, data) for coordinator in coordinators]
+
+
+async def _async_write_configuration(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Write configuration registers of the targeted meters.
+
+    Meters on the same transport are written one after another, transports
+    run concurrently. Every write is verified by reading it back.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_ids = [
+        entry_id
+        for entry_id in await async_extract_config_entry_ids(hass, call)
+        if entry_id in entries
+    ]
+    if not entry_ids:
+        raise ServiceValidationError("No chint_pm meters targeted")
+    if ATTR_ADDRESS in call.data and len(entry_ids) > 1:
+        raise ServiceValidationError("An address can only be set on a single meter")
+
+    transports: dict[tuple, list] = defaultdict(list)
+    for entry_id in entry_ids:
+        coordinator = entries[entry_id][DATA_UPDATE_COORDINATORS][0]
+        transports[coordinator.transport_key].append(coordinator)
+
+    if ATTR_ADDRESS in call.data:
+        (transport_key,) = transports
+        for entry_data in entries.values():
+            coordinator = entry_data[DATA_UPDATE_COORDINATORS][0]
+            if (
+                coordinator.transport_key == transport_key
+                and coordinator.config_entry.entry_id not in entry_ids
+                and coordinator.config_entry.data[CONF_SLAVE_IDS][0]
+                == call.data[ATTR_ADDRESS]
+            ):
+                raise ServiceValidationError(
+                    f"Address {call.data[ATTR_ADDRESS]} is already used by"
+                    f" {coordinator.config_entry.title}"
+                )
+
+    results = await asyncio.gather(
+        *(
+            _async_write_transport(coordinators, call.data)
+            for coordinators in transports.values()
+        )
+    )
+    meters = {
+        coordinator.config_entry.entry_id: report
+        for coordinators, reports in zip(transports.values(), results)
+        for coordinator, report in zip(coordinators, reports)
+    }
+
+    failed = [report["title"] for report in meters.values() if not report["success"]]
+    if failed and not call.return_response:
+        raise HomeAssistantError(f"Writing failed for {', '.join(failed)}")
+    return {"meters": meters}
@@ -0,0 +1,301 @@
+"""Listen-only RTU sniffer for meters polled by another master."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import SNIFF_RECONNECT_DELAY, SNIFF_RESYNC_TIMEOUT
+from .stats import LinkStats
+
+_LOGGER = logging.getLogger(__name__)
+
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+
+def _crc_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes | bytearray | memoryview) -> int:
+    """Return the modbus RTU CRC of data."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+class RtuFrameParser:
+    """Reassemble RTU frames from a raw byte stream.
+
+    A listener cannot rely on the 3.5 character silence between frames, the
+    serial driver hands over bytes in chunks of its own. Frames are found by
+    their function code, the lengths it allows and the CRC instead; bytes
+    that do not start a valid frame are dropped one at a time until the
+    stream is in sync again. A partial frame followed by a long silence is
+    dropped as well.
+    """
+
+    __slots__ = ("_buffer", "_last", "_dropping", "framing_errors")
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._buffer = bytearray()
+        self._last = 0.0
+        self._dropping = False
+        # runs of dropped bytes
+        self.framing_errors = 0
+
+    def feed(self, data: bytes, now: float) -> list[bytes]:
+        """Add received bytes and return the frames completed by them."""
+        if self._buffer and now - self._last > SNIFF_RESYNC_TIMEOUT:
+            self._drop(len(self._buffer))
+        self._last = now
+        self._buffer += data
+
+        frames = []
+        buffer = self._buffer
+        while len(buffer) >= 4:
+            lengths = self._lengths(buffer)
+            incomplete = False
+            for length in lengths:
+                if len(buffer) < length:
+                    incomplete = True
+                elif crc16(memoryview(buffer)[: length - 2]) == (
+                    buffer[length - 2] | buffer[length - 1] << 8
+                ):
+                    frames.append(bytes(buffer[:length]))
+                    del buffer[:length]
+                    self._dropping = False
+                    break
+            else:
+                if incomplete:
+                    break
+                self._drop(1)
+        return frames
+
+    def _drop(self, count: int) -> None:
+        if not self._dropping:
+            self.framing_errors += 1
+            self._dropping = True
+        del self._buffer[:count]
+
+    @staticmethod
+    def _lengths(buffer: bytearray) -> tuple[int, ...]:
+        """Return the possible lengths of a frame starting the buffer."""
+        if not 1 <= buffer[0] <= 247:
+            return ()
+        function = buffer[1]
+        if function & 0x80:
+            return (5,)
+        if function in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            # request or response with its byte count
+            return (8, 5 + buffer[2])
+        if function == WRITE_SINGLE_REGISTER:
+            return (8,)
+        if function == WRITE_MULTIPLE_REGISTERS:
+            # response or request with its byte count
+            return (8, 9 + buffer[6]) if len(buffer) > 6 else (8, 9)
+        return ()
+
+
+class BusSniffer:
+    """Listens to the requests and responses of another master on a serial line.
+
+    The port is opened read-only in spirit: nothing is ever written to it.
+    Read responses are paired with their requests, decoded into registers and
+    handed to the listener registered for the unit id. A listener provides
+    ``link_stats`` and ``async_handle_registers(address, registers,
+    timestamp)``, usually a ChintUpdateCoordinator. The round trip times and
+    errors of the other master are counted like those of a polled bus.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: tuple, port: str, baudrate: int):
+        """Initialize the sniffer."""
+        self._hass = hass
+        self.key = key
+        self.name = port
+        self._baudrate = baudrate
+        self._parser = RtuFrameParser()
+        self._listeners: dict[int, Any] = {}
+        # unit id, function code, address, count and time of the last request
+        self._request: tuple[int, int, int, int, float] | None = None
+        self._serial = None
+        self._lost: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.users = 0
+        self.stats = LinkStats()
+
+    @callback
+    def async_add_listener(self, unit_id: int, listener) -> CALLBACK_TYPE:
+        """Deliver the registers read from unit_id until the callback is called."""
+        self._listeners[unit_id] = listener
+
+        @callback
+        def _remove() -> None:
+            if self._listeners.get(unit_id) is listener:
+                del self._listeners[unit_id]
+
+        return _remove
+
+    @callback
+    def async_start(self) -> None:
+        """Open the port and keep it open in the background."""
+        self._task = self._hass.async_create_background_task(
+            self._run(), f"chint_pm sniffer {self.name}"
+        )
+
+    async def async_close(self) -> None:
+        """Stop listening and close the port."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        opened_before = False
+        while True:
+            try:
+                self._serial = await self._hass.async_add_executor_job(self._open)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("%s: cannot open for listening: %s", self.name, err)
+            else:
+                if opened_before:
+                    self.stats.reconnects += 1
+                opened_before = True
+                self._lost.clear()
+                loop = self._hass.loop
+                loop.add_reader(self._serial.fileno(), self._read_ready)
+                try:
+                    await self._lost.wait()
+                finally:
+                    loop.remove_reader(self._serial.fileno())
+                    await self._hass.async_add_executor_job(self._serial.close)
+                    self._serial = None
+            await asyncio.sleep(SNIFF_RECONNECT_DELAY)
+
+    def _open(self):
+        """Open the port without blocking reads (blocking, executor)."""
+        import serial  # pylint: disable=import-outside-toplevel
+
+        return serial.Serial(
+            self.name,
+            baudrate=self._baudrate,
+            bytesize=8,
+            stopbits=1,
+            parity="N",
+            timeout=0,
+        )
+
+    @callback
+    def _read_ready(self) -> None:
+        try:
+            data = os.read(self._serial.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError as err:
+            _LOGGER.warning("%s: listening failed: %s", self.name, err)
+            self._lost.set()
+            return
+        if not data:
+            self._lost.set()
+            return
+        self.feed(data, time.monotonic())
+
+    @callback
+    def feed(self, data: bytes, now: float) -> None:
+        """Process bytes received at now (monotonic), e.g. of a captured stream."""
+        parser = self._parser
+        framing_errors = parser.framing_errors
+        for frame in parser.feed(data, now):
+            self._handle_frame(frame, now)
+        self.stats.framing_errors += parser.framing_errors - framing_errors
+
+    def _handle_frame(self, frame: bytes, now: float) -> None:
+        unit_id, function = frame[0], frame[1]
+        request = self._request
+        if function & 0x80:
+            if request is not None and request[:2] == (unit_id, function & 0x7F):
+                self._request = None
+                self._record(unit_id, now - request[4], frame[2])
+            return
+
+        if function in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            if len(frame) == 8:
+                # a request, the byte count of a response is always even
+                self._request_seen(frame, now)
+                return
+            count = frame[2] // 2
+            if (
+                request is None
+                or request[:2] != (unit_id, function)
+                or request[3] != count
+            ):
+                # response to a request that was missed or garbled
+                self.stats.framing_errors += 1
+                return
+            self._request = None
+            self._record(unit_id, now - request[4])
+            if function == READ_HOLDING_REGISTERS and (
+                listener := self._listeners.get(unit_id)
+            ):
+                listener.async_handle_registers(
+                    request[2],
+                    list(struct.unpack_from(f">{count}H", frame, 3)),
+                    time.time(),
+                )
+            return
+
+        # writes: the response echoes address and count of the request
+        if (
+            len(frame) == 8
+            and request is not None
+            and request[:2]
+            == (
+                unit_id,
+                function,
+            )
+        ):
+            self._request = None
+            self._record(unit_id, now - request[4])
+        else:
+            self._request_seen(frame, now)
+
+    def _request_seen(self, frame: bytes, now: float) -> None:
+        if (request := self._request) is not None:
+            # the previous request was never answered
+            self.stats.requests += 1
+            self.stats.timeouts += 1
+            if listener := self._listeners.get(request[0]):
+                listener.link_stats.requests += 1
+                listener.link_stats.timeouts += 1
+        address, count = struct.unpack_from(">HH", frame, 2)
+        self._request = (frame[0], frame[1], address, count, now)
+
+    def _record(
+        self, unit_id: int, rtt: float, exception_code: int | None = None
+    ) -> None:
+        self.stats.record_exchange(rtt, exception_code)
+        if listener := self._listeners.get(unit_id):
+            listener.link_stats.record_exchange(rtt, exception_code)
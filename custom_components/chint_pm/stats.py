@@ -0,0 +1,198 @@
+"""Link quality counters of the Chint pm integration."""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from .const import READ_COST_DECAY, READ_COST_MIN_SAMPLES, RTT_SAMPLES
+from .registers import MAX_READ_COUNT
+
+
+class LinkStats:
+    """Communication counters of one slave or one transport.
+
+    All counters are plain integers and the round trip times live in a
+    fixed size ring buffer, so recording a transaction is constant work and
+    the memory use does not grow with uptime.
+
+    pymodbus drops RTU frames with a bad CRC and waits for the next one, so
+    CRC errors surface as timeouts (or as retries within a request); frames
+    answering another device or transaction are counted as framing errors.
+    """
+
+    __slots__ = (
+        "requests",
+        "responses",
+        "timeouts",
+        "framing_errors",
+        "connection_errors",
+        "errors",
+        "reconnects",
+        "exception_codes",
+        "_rtts",
+        "_rtt_count",
+        "_rtt_sum",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.framing_errors = 0
+        self.connection_errors = 0
+        self.errors = 0
+        self.reconnects = 0
+        # modbus exception code -> count
+        self.exception_codes: dict[int, int] = {}
+        self._rtts = array("d", bytes(8 * RTT_SAMPLES))
+        self._rtt_count = 0
+        self._rtt_sum = 0.0
+
+    def record_response(self, response, rtt: float, count: int | None = None) -> None:
+        """Record a response that arrived after rtt seconds.
+
+        With count, a read response holding a different number of registers
+        is a framing error.
+        """
+        self.requests += 1
+        # timeouts retried within pymodbus before this response
+        self.timeouts += getattr(response, "retries", 0) or 0
+        if response.isError():
+            code = getattr(response, "exception_code", 0)
+            self.exception_codes[code] = self.exception_codes.get(code, 0) + 1
+        elif count is not None and len(response.registers) != count:
+            self.framing_errors += 1
+        else:
+            self.responses += 1
+        self._add_rtt(rtt)
+
+    def record_exchange(self, rtt: float, exception_code: int | None = None) -> None:
+        """Record a request and response seen on the line, e.g. by a sniffer."""
+        self.requests += 1
+        if exception_code is not None:
+            self.exception_codes[exception_code] = (
+                self.exception_codes.get(exception_code, 0) + 1
+            )
+        else:
+            self.responses += 1
+        self._add_rtt(rtt)
+
+    def _add_rtt(self, rtt: float) -> None:
+        position = self._rtt_count % RTT_SAMPLES
+        self._rtt_sum += rtt - self._rtts[position]
+        self._rtts[position] = rtt
+        self._rtt_count += 1
+
+    def record_error(self, err: Exception) -> None:
+        """Record a request that raised."""
+        self.requests += 1
+        if isinstance(err, TimeoutError):
+            self.timeouts += 1
+        elif isinstance(err, ConnectionException):
+            self.connection_errors += 1
+        elif isinstance(err, ModbusIOException):
+            if "No response" in str(err):
+                self.timeouts += 1
+            elif "request uses" in str(err):
+                # answer of another device id or transaction id
+                self.framing_errors += 1
+            else:
+                self.errors += 1
+        else:
+            self.errors += 1
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the share of requests answered with a valid response."""
+        return self.responses / self.requests if self.requests else None
+
+    @property
+    def rtt_mean(self) -> float | None:
+        """Return the mean round trip time of the recent responses."""
+        if not self._rtt_count:
+            return None
+        return self._rtt_sum / min(self._rtt_count, RTT_SAMPLES)
+
+    @property
+    def rtt_p95(self) -> float | None:
+        """Return the 95th percentile round trip time of the recent responses."""
+        if not self._rtt_count:
+            return None
+        rtts = sorted(self._rtts[: min(self._rtt_count, RTT_SAMPLES)])
+        return rtts[min(len(rtts) - 1, int(len(rtts) * 0.95))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all counters, e.g. as state attributes."""
+        return {
+            "requests": self.requests,
+            "responses": self.responses,
+            "timeouts": self.timeouts,
+            "framing_errors": self.framing_errors,
+            "connection_errors": self.connection_errors,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "exception_codes": dict(self.exception_codes),
+            "success_rate": self.success_rate,
+            "rtt_mean": self.rtt_mean,
+            "rtt_p95": self.rtt_p95,
+        }
+
+
+class ReadCostModel:
+    """Online estimate of the time of a read: fixed + per_word * count.
+
+    A least squares fit over the successful reads of a bus, with exponential
+    forgetting so a gateway that slows down is followed within about
+    1 / READ_COST_DECAY reads. The prior derived from the transport is used
+    until enough reads were seen, and its per word cost is kept as long as
+    the reads hardly differ in size.
+    """
+
+    __slots__ = ("_weight", "_sx", "_sy", "_sxx", "_sxy", "_prior")
+
+    def __init__(self, fixed: float, per_word: float) -> None:
+        """Initialize the model with a prior."""
+        self._prior = (fixed, per_word)
+        self._weight = self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    def add(self, count: int, seconds: float) -> None:
+        """Add the duration of a read of count registers."""
+        keep = 1 - READ_COST_DECAY
+        self._weight = self._weight * keep + 1
+        self._sx = self._sx * keep + count
+        self._sy = self._sy * keep + seconds
+        self._sxx = self._sxx * keep + count * count
+        self._sxy = self._sxy * keep + count * seconds
+
+    @property
+    def estimate(self) -> tuple[float, float]:
+        """Return the fixed cost per read and the cost per register (s)."""
+        if self._weight < READ_COST_MIN_SAMPLES:
+            return self._prior
+        mean_x = self._sx / self._weight
+        mean_y = self._sy / self._weight
+        variance = self._sxx / self._weight - mean_x * mean_x
+        per_word = self._prior[1]
+        if variance >= 1:
+            per_word = (self._sxy / self._weight - mean_x * mean_y) / variance
+        # noise can make the slope vanish or turn negative
+        per_word = max(per_word, 1e-6)
+        return max(mean_y - per_word * mean_x, 0.0), per_word
+
+    def max_gap(self, overhead: float = 0.0) -> int:
+        """Return the registers worth reading to save one request.
+
+        overhead is the fixed cost per request not seen in the read times,
+        e.g. the inter-frame gap.
+        """
+        fixed, per_word = self.estimate
+        return min(int((fixed + overhead) / per_word), MAX_READ_COUNT)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the current estimate."""
+        fixed, per_word = self.estimate
+        return {"fixed": fixed, "per_word": per_word}
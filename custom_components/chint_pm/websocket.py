@@ -0,0 +1,152 @@
+"""Websocket live stream for the Chint pm integration."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_UPDATE_COORDINATORS, DOMAIN
+
+DEFAULT_MAX_RATE = 1.0
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the chint_pm websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_live)
+
+
+class _LiveSubscription:
+    """Send changed meter values of selected coordinators to one client."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        coordinators: dict[str, Any],
+        keys: set[str] | None,
+        max_rate: float,
+    ) -> None:
+        self._hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._coordinators = coordinators
+        self._keys = keys
+        self._min_interval = 1 / max_rate
+        self._sent: dict[str, dict[str, Any]] = {
+            entry_id: {} for entry_id in coordinators
+        }
+        self._dirty: set[str] = set(coordinators)
+        self._last_frame = 0.0
+        self._timer = None
+        self._unsubs = [
+            coordinator.async_add_listener(self._make_listener(entry_id))
+            for entry_id, coordinator in coordinators.items()
+        ]
+
+    def _make_listener(self, entry_id: str):
+        @callback
+        def _listener() -> None:
+            self._dirty.add(entry_id)
+            self._schedule()
+
+        return _listener
+
+    @callback
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            return
+        delay = self._last_frame + self._min_interval - time.monotonic()
+        if delay <= 0:
+            self.send_frame()
+        else:
+            self._timer = self._hass.loop.call_later(delay, self.send_frame)
+
+    @callback
+    def send_frame(self) -> None:
+        """Send the keys that changed since the last frame."""
+        self._timer = None
+        frame: dict[str, dict[str, Any]] = {}
+        for entry_id in self._dirty:
+            data = self._coordinators[entry_id].device.data
+            sent = self._sent[entry_id]
+            changed = {
+                key: value
+                for key, value in data.items()
+                if (self._keys is None or key in self._keys)
+                and sent.get(key, sent) != value
+            }
+            if changed:
+                sent.update(changed)
+                frame[entry_id] = changed
+        self._dirty.clear()
+        if frame:
+            self._last_frame = time.monotonic()
+            self._connection.send_message(
+                websocket_api.event_message(
+                    self._msg_id, {"time": time.time(), "meters": frame}
+                )
+            )
+
+    @callback
+    def unsubscribe(self) -> None:
+        """Stop listening to the coordinators."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for unsub in self._unsubs:
+            unsub()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "chint_pm/subscribe_live",
+        vol.Optional("entry_ids"): [str],
+        vol.Optional("keys"): [str],
+        vol.Optional("max_rate", default=DEFAULT_MAX_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=0.01, max=20)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_live(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream changed meter values, at most max_rate frames per second.
+
+    The first frame holds all selected values, later frames only the keys
+    that changed since the previous frame. Meters set up after subscribing
+    are not included.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_ids = msg.get("entry_ids", list(entries))
+    if unknown := [entry_id for entry_id in entry_ids if entry_id not in entries]:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"Unknown config entries: {', '.join(unknown)}",
+        )
+        return
+
+    subscription = _LiveSubscription(
+        hass,
+        connection,
+        msg["id"],
+        {
+            entry_id: entries[entry_id][DATA_UPDATE_COORDINATORS][0]
+            for entry_id in entry_ids
+        },
+        set(msg["keys"]) if "keys" in msg else None,
+        msg["max_rate"],
+    )
+    connection.subscriptions[msg["id"]] = subscription.unsubscribe
+    connection.send_result(msg["id"])
+    subscription.send_frame()